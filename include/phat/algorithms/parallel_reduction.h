@@ -0,0 +1,104 @@
+/*  This file is part of PHAT.
+
+    PHAT is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    PHAT is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with PHAT.  If not, see <http://www.gnu.org/licenses/>. */
+
+#pragma once
+
+#include <phat/helpers/misc.h>
+#include <phat/boundary_matrix.h>
+
+namespace phat {
+    // Reduces the columns of one dimension at a time, in rounds. In every round, each lowest one
+    // shared by several columns is kept by the leftmost of them, and all other columns are reduced
+    // in parallel, by adding the columns that keep their lowest ones. Those are not modified during
+    // the round, so the additions of different columns are independent. Columns with a lowest one of
+    // their own (e.g. apparent pairs) need no work at all. Between dimensions, the lowest ones of the
+    // reduced columns are cleared, as in the twist reduction.
+    class parallel_reduction {
+    public:
+        template< typename Representation >
+        void operator () ( boundary_matrix< Representation >& boundary_matrix ) {
+
+            const index nr_columns = boundary_matrix.get_num_cols();
+            std::vector< index > lowest_one_lookup( nr_columns, -1 );
+            std::vector< index > lowest_ones( nr_columns, -1 );
+
+            for( index cur_dim = boundary_matrix.get_max_dim(); cur_dim >= 1; cur_dim-- ) {
+                std::vector< index > dim_columns;
+                for( index cur_col = 0; cur_col < nr_columns; cur_col++ )
+                    if( boundary_matrix.get_dim( cur_col ) == cur_dim )
+                        dim_columns.push_back( cur_col );
+
+                #pragma omp parallel for schedule( guided, 1 )
+                for( index idx = 0; idx < (index)dim_columns.size(); idx++ )
+                    lowest_ones[ dim_columns[ idx ] ] = boundary_matrix.get_max_index( dim_columns[ idx ] );
+
+                std::vector< index > conflicts;
+                _assign_lowest_ones( dim_columns, lowest_ones, lowest_one_lookup, conflicts );
+
+                while( !conflicts.empty() ) {
+                    #pragma omp parallel for schedule( guided, 1 )
+                    for( index idx = 0; idx < (index)conflicts.size(); idx++ ) {
+                        const index cur_col = conflicts[ idx ];
+                        index lowest_one = lowest_ones[ cur_col ];
+                        while( lowest_one != -1 && lowest_one_lookup[ lowest_one ] != -1 && lowest_one_lookup[ lowest_one ] < cur_col ) {
+                            boundary_matrix.add_to( lowest_one_lookup[ lowest_one ], cur_col );
+                            lowest_one = boundary_matrix.get_max_index( cur_col );
+                        }
+                        lowest_ones[ cur_col ] = lowest_one;
+                    }
+                    boundary_matrix.sync();
+
+                    std::vector< index > next_conflicts;
+                    _assign_lowest_ones( conflicts, lowest_ones, lowest_one_lookup, next_conflicts );
+                    conflicts.swap( next_conflicts );
+                }
+
+                #pragma omp parallel for schedule( guided, 1 )
+                for( index idx = 0; idx < (index)dim_columns.size(); idx++ ) {
+                    const index cur_col = dim_columns[ idx ];
+                    if( lowest_ones[ cur_col ] != -1 )
+                        boundary_matrix.clear( lowest_ones[ cur_col ] );
+                    boundary_matrix.finalize( cur_col );
+                }
+                boundary_matrix.sync();
+            }
+        }
+
+    protected:
+        // Lets each of the given columns keep its lowest one, unless a column to its left has the same
+        // lowest one. The columns that lose out (including previous owners) are collected in 'conflicts'.
+        void _assign_lowest_ones( const std::vector< index >& columns
+                                , const std::vector< index >& lowest_ones
+                                , std::vector< index >& lowest_one_lookup
+                                , std::vector< index >& conflicts ) {
+
+            for( index idx = 0; idx < (index)columns.size(); idx++ ) {
+                const index cur_col = columns[ idx ];
+                const index lowest_one = lowest_ones[ cur_col ];
+                if( lowest_one == -1 )
+                    continue;
+                index& owner = lowest_one_lookup[ lowest_one ];
+                if( owner == -1 ) {
+                    owner = cur_col;
+                } else if( cur_col < owner ) {
+                    conflicts.push_back( owner );
+                    owner = cur_col;
+                } else {
+                    conflicts.push_back( cur_col );
+                }
+            }
+        }
+    };
+}
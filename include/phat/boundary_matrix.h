@@ -213,50 +213,41 @@ namespace phat {
         // Format: each line represents a column, first number is dimension, other numbers are the content of the column.
         // Ignores empty lines and lines starting with a '#'.
         bool load_ascii( std::string filename ) { 
-            // first count number of columns:
-            std::string cur_line;
-            std::ifstream dummy( filename .c_str() );
-            if( dummy.fail() )
-                return false;
-
-            index number_of_columns = 0;
-            while( getline( dummy, cur_line ) ) {
-                cur_line.erase(cur_line.find_last_not_of(" \t\n\r\f\v") + 1);
-                if( cur_line != "" && cur_line[ 0 ] != '#' )
-                    number_of_columns++;
-
-            }
-            this->set_num_cols( number_of_columns );
-            dummy.close();
-
             std::ifstream input_stream( filename.c_str() );
             if( input_stream.fail() )
                 return false;
-            
-            column temp_col;
-            index cur_col = -1;
+
+            // read the file in a single pass, collecting all columns back to back in @entries
+            std::vector< dimension > dims;
+            std::vector< index > offsets( 1, 0 );
+            std::vector< index > entries;
+            std::string cur_line;
             while( getline( input_stream, cur_line ) ) {
                 cur_line.erase(cur_line.find_last_not_of(" \t\n\r\f\v") + 1);
                 if( cur_line != "" && cur_line[ 0 ] != '#' ) {
-                    cur_col++;
-                    std::stringstream ss( cur_line );
-                    
-                    int64_t temp_dim;
-                    ss >> temp_dim;
-                    this->set_dim( cur_col, (dimension) temp_dim );
-
-                    int64_t temp_index;
-                    temp_col.clear();
-                    while( ss.good() ) {
-                        ss >> temp_index;
-                        temp_col.push_back( (index)temp_index );
+                    const char* cur_pos = cur_line.c_str();
+                    char* next_pos;
+                    dims.push_back( (dimension)strtoll( cur_pos, &next_pos, 10 ) );
+                    for( cur_pos = next_pos; ; cur_pos = next_pos ) {
+                        int64_t temp_index = strtoll( cur_pos, &next_pos, 10 );
+                        if( next_pos == cur_pos )
+                            break;
+                        entries.push_back( (index)temp_index );
                     }
-                    std::sort( temp_col.begin(), temp_col.end() );
-                    this->set_col( cur_col, temp_col );
+                    std::sort( entries.begin() + offsets.back(), entries.end() );
+                    offsets.push_back( (index)entries.size() );
                 }
             }
-
             input_stream.close();
+
+            const index number_of_columns = (index)dims.size();
+            this->set_num_cols( number_of_columns );
+            column temp_col;
+            for( index cur_col = 0; cur_col < number_of_columns; cur_col++ ) {
+                this->set_dim( cur_col, dims[ cur_col ] );
+                temp_col.assign( entries.begin() + offsets[ cur_col ], entries.begin() + offsets[ cur_col + 1 ] );
+                this->set_col( cur_col, temp_col );
+            }
             return true;
         }
 
@@ -274,7 +265,7 @@ namespace phat {
                 this->get_col( cur_col, tempCol );
                 for( index cur_row_idx = 0; cur_row_idx < (index)tempCol.size(); cur_row_idx++ )
                     output_stream << " " << tempCol[ cur_row_idx ];
-                output_stream << std::endl;
+                output_stream << '\n';
             }
 
             output_stream.close();
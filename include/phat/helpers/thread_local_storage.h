@@ -29,7 +29,9 @@ class thread_local_storage
 {
 public:
 
-    thread_local_storage() : per_thread_storage( omp_get_max_threads() * PHAT_TLS_SPACING_FACTOR ) {};
+    // reserve a slot for every processor, even if fewer threads are currently requested,
+    // so that the number of threads may be raised again later on (up to the number of processors)
+    thread_local_storage() : per_thread_storage( std::max( omp_get_max_threads(), omp_get_num_procs() ) * PHAT_TLS_SPACING_FACTOR ) {};
 
     T& operator()() {
         return per_thread_storage[ omp_get_thread_num() * PHAT_TLS_SPACING_FACTOR ];
@@ -47,6 +49,11 @@ public:
         return per_thread_storage[ tid * PHAT_TLS_SPACING_FACTOR ];
     }
 
+    // number of reserved slots, which may be more than the number of threads currently running
+    int get_num_slots() const {
+        return (int)( per_thread_storage.size() / PHAT_TLS_SPACING_FACTOR );
+    }
+
 protected:
     std::vector< T > per_thread_storage; 
 };
@@ -81,9 +81,9 @@ namespace phat {
                 return false;
 
             this->sort();
-            output_stream << get_num_pairs() << std::endl;
+            output_stream << get_num_pairs() << '\n';
             for( std::size_t idx = 0; idx < pairs.size(); idx++ ) {
-                output_stream << pairs[idx].first << " " << pairs[idx].second << std::endl;
+                output_stream << pairs[idx].first << " " << pairs[idx].second << '\n';
             }
 
             output_stream.close();
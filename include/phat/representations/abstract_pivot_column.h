@@ -36,6 +36,8 @@ namespace phat {
         // For parallization purposes, it could be more than one full column
         mutable thread_local_storage< pivot_col > pivot_cols;
         mutable thread_local_storage< index > idx_of_pivot_cols;
+        // number of columns each pivot column was initialized for, -1 if it wasn't initialized yet
+        mutable thread_local_storage< index > pivot_col_sizes;
 
         pivot_col& get_pivot_col() const {
             return pivot_cols();
@@ -46,27 +48,44 @@ namespace phat {
         }
       
         void release_pivot_col() {
-            index idx = idx_of_pivot_cols();
+            release_pivot_col( omp_get_thread_num() );
+        }
+
+        void release_pivot_col( int tid ) {
+            index idx = idx_of_pivot_cols[ tid ];
             if( idx != -1 ) {
                 this->matrix[ idx ].clear();
-                pivot_cols().get_col_and_clear( this->matrix[ idx ] );
+                pivot_cols[ tid ].get_col_and_clear( this->matrix[ idx ] );
             }
-            idx_of_pivot_cols() = -1;
+            idx_of_pivot_cols[ tid ] = -1;
         }
         
         void make_pivot_col( index idx ) {
             release_pivot_col();
+            // the pivot columns of threads that weren't running when the number of columns
+            // was set are only initialized once they are first used
+            if( pivot_col_sizes() != Base::_get_num_cols() ) {
+                pivot_cols().init( Base::_get_num_cols() );
+                pivot_col_sizes() = Base::_get_num_cols();
+            }
             idx_of_pivot_cols() = idx;
             get_pivot_col().add_col( matrix[ idx ] );
         }
 
     public:  
 
+        // only the pivot columns of the threads running now are initialized. The number of
+        // threads may be raised before the next reduction, so the other slots are marked as
+        // not initialized, and make_pivot_col sets them up when they are first used
         void _set_num_cols( index nr_of_cols ) {
+            for( int tid = 0; tid < pivot_cols.get_num_slots(); tid++ ) {
+                idx_of_pivot_cols[ tid ] = -1;
+                pivot_col_sizes[ tid ] = -1;
+            }
             #pragma omp parallel for
             for( int tid = 0; tid < omp_get_num_threads(); tid++ ) {
                 pivot_cols[ tid ].init( nr_of_cols );
-                idx_of_pivot_cols[ tid ] = -1;
+                pivot_col_sizes[ tid ] = nr_of_cols;
             }
             Base::_set_num_cols( nr_of_cols );
         }
@@ -79,8 +98,8 @@ namespace phat {
 
         void _sync() { 
             #pragma omp parallel for
-            for( int tid = 0; tid < omp_get_num_threads(); tid++ )
-                release_pivot_col();
+            for( int tid = 0; tid < pivot_cols.get_num_slots(); tid++ )
+                release_pivot_col( tid );
         } 
 
         void _get_col( index idx, column& col  ) const { is_pivot_col( idx ) ? get_pivot_col().get_col( col ) : Base::_get_col( idx, col ); }
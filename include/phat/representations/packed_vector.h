@@ -0,0 +1,197 @@
+/*  This file is part of PHAT.
+
+    PHAT is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    PHAT is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with PHAT.  If not, see <http://www.gnu.org/licenses/>. */
+
+#pragma once
+
+#include <phat/helpers/misc.h>
+
+// number of entries in a storage block of packed_vector
+#define PHAT_PACKED_VECTOR_BLOCK_SIZE 65536
+
+namespace phat {
+    // Same column format as vector_vector, but instead of one allocation per column,
+    // the columns are stored back to back in a few large blocks. After loading, the
+    // matrix is one contiguous array in column order, like a compressed sparse column
+    // matrix. A column that outgrows its slot during the reduction moves to the end
+    // of the last block, with room to grow, and the space it leaves behind is
+    // reclaimed by _sync().
+    class packed_vector {
+
+    protected:
+        std::vector< dimension > dims;
+
+        // first entry, number of entries, and reserved space of each column
+        std::vector< index* > starts;
+        std::vector< index > sizes;
+        std::vector< index > capacities;
+
+        // blocks never change size once created, so 'starts' stays valid when more are added
+        std::vector< std::vector< index > > blocks;
+        index used_in_last_block;
+        index num_stored;
+
+        thread_local_storage< column > temp_column_buffer;
+
+        // reserves space for 'capacity' entries in the last block, adding a new block if needed.
+        // Several threads may add to different columns at the same time, so this is serialized.
+        index* _allocate( index capacity ) {
+            index* result;
+            #pragma omp critical( packed_vector_allocate )
+            {
+                if( blocks.empty() || used_in_last_block + capacity > (index)blocks.back().size() ) {
+                    index block_size = std::max( capacity, (index)PHAT_PACKED_VECTOR_BLOCK_SIZE );
+                    blocks.push_back( std::vector< index >( block_size ) );
+                    used_in_last_block = 0;
+                    num_stored += block_size;
+                }
+                result = blocks.back().data() + used_in_last_block;
+                used_in_last_block += capacity;
+            }
+            return result;
+        }
+
+        // replaces the content of this matrix with the columns of 'other' (which may be *this),
+        // packed into a single block without gaps
+        void _pack_from( const packed_vector& other ) {
+            const index nr_columns = (index)other.starts.size();
+            index num_entries = 0;
+            for( index idx = 0; idx < nr_columns; idx++ )
+                num_entries += other.sizes[ idx ];
+
+            std::vector< index > block( num_entries );
+            std::vector< index* > new_starts( nr_columns );
+            index offset = 0;
+            for( index idx = 0; idx < nr_columns; idx++ ) {
+                new_starts[ idx ] = block.data() + offset;
+                std::copy( other.starts[ idx ], other.starts[ idx ] + other.sizes[ idx ], new_starts[ idx ] );
+                offset += other.sizes[ idx ];
+            }
+
+            dims = other.dims;
+            sizes = other.sizes;
+            capacities = other.sizes;
+            starts.swap( new_starts );
+            blocks.clear();
+            blocks.push_back( std::vector< index >() );
+            blocks.back().swap( block );
+            used_in_last_block = num_entries;
+            num_stored = num_entries;
+        }
+
+    public:
+        packed_vector() : used_in_last_block( 0 ), num_stored( 0 ) {}
+
+        // the column pointers refer to our own blocks, so copies have to be rebuilt
+        packed_vector( const packed_vector& other ) : used_in_last_block( 0 ), num_stored( 0 ) {
+            _pack_from( other );
+        }
+
+        packed_vector& operator=( const packed_vector& other ) {
+            if( this != &other )
+                _pack_from( other );
+            return *this;
+        }
+
+        // overall number of cells in boundary_matrix
+        index _get_num_cols() const {
+            return (index)starts.size();
+        }
+        void _set_num_cols( index nr_of_columns ) {
+            dims.resize( nr_of_columns );
+            starts.resize( nr_of_columns, 0 );
+            sizes.resize( nr_of_columns, 0 );
+            capacities.resize( nr_of_columns, 0 );
+        }
+
+        // dimension of given index
+        dimension _get_dim( index idx ) const {
+            return dims[ idx ];
+        }
+        void _set_dim( index idx, dimension dim ) {
+            dims[ idx ] = dim;
+        }
+
+        // replaces(!) content of 'col' with boundary of given index
+        void _get_col( index idx, column& col ) const {
+            col.assign( starts[ idx ], starts[ idx ] + sizes[ idx ] );
+        }
+        void _set_col( index idx, const column& col ) {
+            const index new_size = (index)col.size();
+            if( new_size > capacities[ idx ] ) {
+                starts[ idx ] = _allocate( new_size );
+                capacities[ idx ] = new_size;
+            }
+            std::copy( col.begin(), col.end(), starts[ idx ] );
+            sizes[ idx ] = new_size;
+        }
+
+        // true iff boundary of given idx is empty
+        bool _is_empty( index idx ) const {
+            return sizes[ idx ] == 0;
+        }
+
+        // largest row index of given column idx (new name for lowestOne())
+        index _get_max_index( index idx ) const {
+            return sizes[ idx ] == 0 ? -1 : starts[ idx ][ sizes[ idx ] - 1 ];
+        }
+
+        // removes the maximal index of a column
+        void _remove_max( index idx ) {
+            sizes[ idx ]--;
+        }
+
+        // clears given column
+        void _clear( index idx ) {
+            sizes[ idx ] = 0;
+        }
+
+        // syncronizes all data structures (essential for openmp stuff)
+        // Called between the parallel phases, so this is where abandoned slots are reclaimed,
+        // once they take up more space than the columns themselves.
+        void _sync() {
+            index num_entries = 0;
+            for( index idx = 0; idx < _get_num_cols(); idx++ )
+                num_entries += sizes[ idx ];
+            if( num_stored > 2 * num_entries + PHAT_PACKED_VECTOR_BLOCK_SIZE )
+                _pack_from( *this );
+        }
+
+        // adds column 'source' to column 'target'
+        void _add_to( index source, index target ) {
+            const index* source_begin = starts[ source ];
+            const index* target_begin = starts[ target ];
+            column& temp_col = temp_column_buffer();
+
+            size_t max_size = sizes[ source ] + sizes[ target ];
+            if( max_size > temp_col.size() ) temp_col.resize( max_size );
+
+            std::vector< index >::iterator col_end = std::set_symmetric_difference( target_begin, target_begin + sizes[ target ],
+                                                                                    source_begin, source_begin + sizes[ source ],
+                                                                                    temp_col.begin() );
+            const index new_size = (index)( col_end - temp_col.begin() );
+
+            // a growing column moves, with twice the space it needs, so it doesn't have to move on every addition
+            if( new_size > capacities[ target ] ) {
+                starts[ target ] = _allocate( 2 * new_size );
+                capacities[ target ] = 2 * new_size;
+            }
+            std::copy( temp_col.begin(), col_end, starts[ target ] );
+            sizes[ target ] = new_size;
+        }
+
+        // finalizes given column
+        void _finalize( index ) {}
+    };
+}
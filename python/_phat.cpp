@@ -8,6 +8,10 @@
 #include <pybind11/operators.h>
 #include <pybind11/numpy.h>
 
+#include <limits>
+#include <atomic>
+#include <unordered_map>
+
 //All the things we're going to wrap
 #include "phat/persistence_pairs.h"
 #include "phat/compute_persistence_pairs.h"
@@ -21,16 +25,31 @@
 #include <phat/representations/heap_pivot_column.h>
 #include <phat/representations/full_pivot_column.h>
 #include <phat/representations/bit_tree_pivot_column.h>
+#include <phat/representations/packed_vector.h>
 #include <phat/algorithms/twist_reduction.h>
 #include <phat/algorithms/standard_reduction.h>
 #include <phat/algorithms/row_reduction.h>
 #include <phat/algorithms/chunk_reduction.h>
 #include <phat/algorithms/spectral_sequence_reduction.h>
+#include <phat/algorithms/parallel_reduction.h>
 
 namespace py = pybind11;
 
 //## Some template functions we'll need later
 
+// The number of threads requested through `set_num_threads`, or 0 to keep OpenMP's default.
+// `omp_set_num_threads` only affects the OS thread that calls it, so rather than calling it
+// once, the reductions apply the stored value on whichever thread they run, e.g. the
+// worker threads of a Python thread pool.
+static std::atomic<int> requested_num_threads(0);
+
+void apply_num_threads() {
+  const int num_threads = requested_num_threads.load();
+  if (num_threads > 0) {
+    omp_set_num_threads(num_threads);
+  }
+}
+
 // This function defines two Python functions in the extension module, that are named
 // `compute_persistence_pairs_${rep}_${reduction}`
 // `compute_persistence_pairs_dualized_${rep}_${reductionx}`.
@@ -56,15 +75,22 @@ void define_compute_persistence(py::module &mod,
 
   //We don't annotate these with doc strings or py::args because
   //they are only used internally by code in phat.py
+  //
+  //The reductions don't touch any Python objects, so they release the GIL while they
+  //run, letting other Python threads (e.g. ones reducing other matrices) go on.
   mod.def((std::string("compute_persistence_pairs_") + suffix).c_str(),
           [](phat::boundary_matrix<Representation> &matrix){
             phat::persistence_pairs pairs;
+            py::gil_scoped_release release;
+            apply_num_threads();
             phat::compute_persistence_pairs<Reduction>(pairs, matrix);
             return pairs;
           });
   mod.def((std::string("compute_persistence_pairs_dualized_") + suffix).c_str(),
           [](phat::boundary_matrix<Representation> &matrix){
             phat::persistence_pairs pairs;
+            py::gil_scoped_release release;
+            apply_num_threads();
             phat::compute_persistence_pairs_dualized<Reduction>(pairs, matrix);
             return pairs;
           });
@@ -79,10 +105,80 @@ void define_converter(py::module &mod, const std::string &self_suffix, const std
   //they are only used internally by code in phat.py
   mod.def((std::string("convert_") + other_suffix + "_to_" + self_suffix).c_str(),
           [](phat::boundary_matrix<OtherRep> &other) {
+            //Unlike the reductions, conversions keep the GIL. Reading a column is not
+            //always read only: e.g. `vector_heap` sorts it in a per-thread buffer, and
+            //every Python thread is thread 0 as far as OpenMP is concerned, so two
+            //Python threads converting the same matrix at once would share that buffer.
             return phat::boundary_matrix<SelfRep>(other);
           });
 }
 
+// Fills a `boundary_matrix` from arrays in compressed sparse form: column `i` has
+// dimension `dims[i]`, and its boundary is `indices[offsets[i]:offsets[i + 1]]`.
+// The arrays come in the order `scipy.sparse.csc_matrix` keeps them, followed by `dims`.
+// The entries are copied straight out of the array buffers, so no Python lists
+// are created along the way. `Index` is the integer type of the `indices` array.
+template <typename Matrix, typename Index>
+void load_csr(Matrix &m,
+              py::array_t<phat::index, py::array::c_style | py::array::forcecast> offsets,
+              py::array_t<Index, py::array::c_style | py::array::forcecast> indices,
+              py::array_t<int, py::array::c_style | py::array::forcecast> dims) {
+  const phat::index nr_columns = dims.size();
+  if (offsets.size() != nr_columns + 1) {
+    throw py::value_error("offsets must have exactly one more entry than dims");
+  }
+  const int *dim = dims.data();
+  const phat::index *offset = offsets.data();
+  const Index *entries = indices.data();
+  if (offset[0] < 0 || offset[nr_columns] > indices.size()) {
+    throw py::value_error("offsets must lie within indices");
+  }
+  for(phat::index i = 0; i < nr_columns; i++) {
+    if (offset[i + 1] < offset[i]) {
+      throw py::value_error("offsets must be non-decreasing");
+    }
+  }
+  //Every entry refers to another column, and the representations index their
+  //storage with it without further checks
+  for(phat::index k = offset[0]; k < offset[nr_columns]; k++) {
+    const phat::index entry = (phat::index)entries[k];
+    if (entry < 0 || entry >= nr_columns) {
+      throw py::value_error("indices must lie between 0 and the number of columns");
+    }
+  }
+  m.set_num_cols(nr_columns);
+  phat::column col;
+  for(phat::index i = 0; i < nr_columns; i++) {
+    m.set_dim(i, dim[i]);
+    col.assign(entries + offset[i], entries + offset[i + 1]);
+    m.set_col(i, col);
+  }
+}
+
+// Copies a `boundary_matrix` out into the three arrays that `load_csr` takes, with
+// the boundary entries stored as `Index`.
+template <typename Index, typename Matrix>
+py::tuple get_csr(Matrix &m) {
+  const phat::index nr_columns = m.get_num_cols();
+  if (nr_columns > 0 &&
+      (uint64_t)(nr_columns - 1) > (uint64_t)std::numeric_limits<Index>::max()) {
+    throw py::value_error("The matrix has too many columns for the requested index type");
+  }
+  std::vector<int> dims(nr_columns);
+  std::vector<phat::index> offsets(nr_columns + 1, 0);
+  std::vector<Index> entries;
+  phat::column col;
+  for(phat::index i = 0; i < nr_columns; i++) {
+    dims[i] = m.get_dim(i);
+    m.get_col(i, col);
+    entries.insert(entries.end(), col.begin(), col.end());
+    offsets[i + 1] = entries.size();
+  }
+  return py::make_tuple(py::array_t<phat::index>(offsets.size(), offsets.data()),
+                        py::array_t<Index>(entries.size(), entries.data()),
+                        py::array_t<int>(dims.size(), dims.data()));
+}
+
 // Creates a Python class for a `boundary_matrix<T>`. Boundary matrices are one of two important types
 // used by PHAT.
 template<class T>
@@ -106,6 +202,21 @@ void wrap_boundary_matrix(py::module &mod, const std::string &representation_suf
         return std::tuple<std::vector<std::vector<int>>, std::vector<int>>(vector_vector_matrix, vector_dims);
       },
       "Extract the data in the boundary matrix into a list of columns, and a list of dimensions that correspond to the columns")
+    //#### Loading from NumPy arrays
+    //See the `load_csr` and `get_csr` templates above for the layout of the arrays.
+    .def("load_csr", &load_csr<mat, phat::index>,
+         "Load this instance from offset, index and dimension arrays in compressed sparse form",
+         py::arg("offsets"), py::arg("indices"), py::arg("dims"))
+    //The `_u32` variants move the boundary entries as 32 bit unsigned integers, which
+    //halves the size of the `indices` array, and avoids converting it to 64 bits
+    //first when it was built with that type already.
+    .def("load_csr_u32", &load_csr<mat, uint32_t>,
+         "Load this instance from compressed sparse arrays with uint32 indices",
+         py::arg("offsets"), py::arg("indices"), py::arg("dims"))
+    .def("get_csr", &get_csr<phat::index, mat>,
+         "Extract the data in the boundary matrix as offset, index and dimension arrays in compressed sparse form")
+    .def("get_csr_u32", &get_csr<uint32_t, mat>,
+         "Extract the data in the boundary matrix as compressed sparse arrays with uint32 indices")
     //#### Loading and saving files
     .def("load_binary", &mat::load_binary,
          "Load this instance with data from a binary file")
@@ -134,6 +245,16 @@ void wrap_boundary_matrix(py::module &mod, const std::string &representation_suf
       },
       "Set the dimension list for this boundary matrix",
       py::arg("dimensions"))
+    //`get_dims` is the bulk counterpart of `get_dim`. Filling a NumPy array in C++
+    //costs one call from Python, instead of one call (and one Python int) per column.
+    .def("get_dims", [](mat &m) {
+        std::vector<int> dims(m.get_num_cols());
+        for(size_t i = 0; i < dims.size(); i++) {
+          dims[i] = m.get_dim(i);
+        }
+        return py::array_t<int>(dims.size(), dims.data());
+      },
+      "Get the dimensions of all the columns as a NumPy array")
 
     //#### \__eq__
     //The `boundary_matrix<T>`'s `operator==` is templated, which could make a Python wrapper
@@ -148,6 +269,7 @@ void wrap_boundary_matrix(py::module &mod, const std::string &representation_suf
     .def("__eq__", &mat::template operator==<phat::vector_heap>)
     .def("__eq__", &mat::template operator==<phat::vector_set>)
     .def("__eq__", &mat::template operator==<phat::vector_list>)
+    .def("__eq__", &mat::template operator==<phat::packed_vector>)
 
     //Python 3.x can figure this out for itself, but Python 2.7 needs to be told:
     .def("__ne__", &mat::template operator!=<phat::bit_tree_pivot_column>)
@@ -158,6 +280,7 @@ void wrap_boundary_matrix(py::module &mod, const std::string &representation_suf
     .def("__ne__", &mat::template operator!=<phat::vector_heap>)
     .def("__ne__", &mat::template operator!=<phat::vector_set>)
     .def("__ne__", &mat::template operator!=<phat::vector_list>)
+    .def("__ne__", &mat::template operator!=<phat::packed_vector>)
 
     //#### Data access
 
@@ -172,12 +295,28 @@ void wrap_boundary_matrix(py::module &mod, const std::string &representation_suf
       },
       "Extract a single column as a list",
       py::arg("index"))
+    // This overload of `set_col` copies a NumPy array straight out of its buffer, rather
+    // than converting the column one Python int at a time. pybind11 tries overloads in
+    // the order they are defined, so it must come before the list version.
+    .def("set_col", [](mat &m, phat::index col_index,
+                       py::array_t<phat::index, py::array::c_style | py::array::forcecast> values) {
+        phat::column col(values.data(), values.data() + values.size());
+        m.set_col(col_index, col);
+      },
+      "Set the values for a given column from a NumPy array",
+      py::arg("index"), py::arg("column"))
          .def("set_col", &mat::set_col,
               "Set the values for a given column",
               py::arg("index"), py::arg("column"))
     .def("get_num_cols", &mat::get_num_cols)
     .def("is_empty", &mat::is_empty)
-    .def("get_num_entries", &mat::get_num_entries);
+    .def("get_num_entries", &mat::get_num_entries)
+    //A plain C++ copy of the matrix, without going through a conversion
+    .def("clone", [](const mat &m) {
+        py::gil_scoped_release release;
+        return mat(m);
+      },
+      "Make a copy of this matrix, with the same representation");
 
   //#### Compute persistence
   // Define compute_persistence(_dualized) for all possible reductions.
@@ -186,6 +325,7 @@ void wrap_boundary_matrix(py::module &mod, const std::string &representation_suf
   define_compute_persistence<phat::row_reduction, T>(mod, representation_suffix, std::string("rr"));
   define_compute_persistence<phat::twist_reduction, T>(mod, representation_suffix, std::string("tr"));
   define_compute_persistence<phat::spectral_sequence_reduction, T>(mod, representation_suffix, std::string("ssr"));
+  define_compute_persistence<phat::parallel_reduction, T>(mod, representation_suffix, std::string("pr"));
   //#### Converters
   //Define functions to convert from this kind of `boundary_matrix` to any of the other types
   define_converter<T, phat::bit_tree_pivot_column>(mod, representation_suffix, std::string("btpc"));
@@ -196,6 +336,7 @@ void wrap_boundary_matrix(py::module &mod, const std::string &representation_suf
   define_converter<T, phat::vector_heap>(mod, representation_suffix, std::string("vh"));
   define_converter<T, phat::vector_set>(mod, representation_suffix, std:: string("vs"));
   define_converter<T, phat::vector_list>(mod, representation_suffix, std::string("vl"));
+  define_converter<T, phat::packed_vector>(mod, representation_suffix, std::string("pv"));
 }
 //fix_index checks for out-of-bounds indexes, and converts negative indices to positive ones
 //e.g. pairs[-1] => pairs[len(pairs) - 1]
@@ -216,14 +357,97 @@ phat::index fix_index(const phat::persistence_pairs &p, int index) {
 
 //Here we define the wrapper for the persistence_pairs class. Unlike `boundary_matrix`, this
 //class is not templated, so is simpler to wrap.
+//`persistence_pairs` keeps its pairs in a protected vector. Deriving from it lets us
+//name that member, so the buffer protocol can expose it without changing the C++ class.
+struct persistence_pairs_access : phat::persistence_pairs {
+  static std::vector<std::pair<phat::index, phat::index>> &pairs_of(phat::persistence_pairs &p) {
+    return p.*(&persistence_pairs_access::pairs);
+  }
+
+  //The number of buffers currently exported by each instance. Buffers are only
+  //requested and released with the GIL held, so a plain map will do.
+  static std::unordered_map<const phat::persistence_pairs *, int> &exports() {
+    static std::unordered_map<const phat::persistence_pairs *, int> counts;
+    return counts;
+  }
+
+  //Like `bytearray`, the pairs can't be resized while a buffer is exported, since
+  //that may move them, and leave the buffer pointing at freed memory.
+  static void check_resizable(const phat::persistence_pairs &p) {
+    if (exports().count(&p)) {
+      throw py::buffer_error("Existing exports of data: the pairs cannot be resized");
+    }
+  }
+};
+
+//The buffer protocol lets `numpy.asarray(pairs)` view the pairs as an (n, 2) int64
+//array in place, without creating a Python tuple per pair. pybind11's `def_buffer`
+//has no hook for when a buffer is released, so these two fill in the slots of the
+//Python type directly, and keep count of the exports.
+extern "C" int persistence_pairs_getbuffer(PyObject *obj, Py_buffer *view, int flags) {
+  if (view == nullptr) {
+    PyErr_SetString(PyExc_BufferError, "persistence_pairs_getbuffer(): no view given");
+    return -1;
+  }
+  view->obj = nullptr;
+  if ((flags & PyBUF_WRITABLE) == PyBUF_WRITABLE) {
+    PyErr_SetString(PyExc_BufferError, "persistence_pairs only exports read only buffers");
+    return -1;
+  }
+  phat::persistence_pairs &p = py::handle(obj).cast<phat::persistence_pairs &>();
+  std::vector<std::pair<phat::index, phat::index>> &pairs = persistence_pairs_access::pairs_of(p);
+  //Shape and strides, kept alive until the buffer is released
+  py::ssize_t *layout = new py::ssize_t[4] { (py::ssize_t)pairs.size(), 2,
+                                             (py::ssize_t)sizeof(std::pair<phat::index, phat::index>),
+                                             (py::ssize_t)sizeof(phat::index) };
+  static const std::string format = py::format_descriptor<phat::index>::format();
+  view->buf = pairs.empty() ? nullptr : &pairs[0].first;
+  view->itemsize = sizeof(phat::index);
+  view->len = 2 * pairs.size() * sizeof(phat::index);
+  view->readonly = 1;
+  view->format = (flags & PyBUF_FORMAT) == PyBUF_FORMAT ? const_cast<char *>(format.c_str()) : nullptr;
+  view->ndim = (flags & PyBUF_ND) == PyBUF_ND ? 2 : 1;
+  view->shape = (flags & PyBUF_ND) == PyBUF_ND ? layout : nullptr;
+  view->strides = (flags & PyBUF_STRIDES) == PyBUF_STRIDES ? layout + 2 : nullptr;
+  view->suboffsets = nullptr;
+  view->internal = layout;
+  view->obj = obj;
+  Py_INCREF(obj);
+  persistence_pairs_access::exports()[&p]++;
+  return 0;
+}
+
+extern "C" void persistence_pairs_releasebuffer(PyObject *obj, Py_buffer *view) {
+  delete[] (py::ssize_t *) view->internal;
+  const phat::persistence_pairs *p = &py::handle(obj).cast<phat::persistence_pairs &>();
+  if (--persistence_pairs_access::exports()[p] == 0) {
+    persistence_pairs_access::exports().erase(p);
+  }
+}
+
 void wrap_persistence_pairs(py::module &m) {
-  py::class_<phat::persistence_pairs>(m, "persistence_pairs")
+  py::class_<phat::persistence_pairs> cls(m, "persistence_pairs");
+  //The slots are set by name, since Python 2's PyBufferProcs starts with the old buffer slots
+  static PyBufferProcs buffer_procs;
+  buffer_procs.bf_getbuffer = persistence_pairs_getbuffer;
+  buffer_procs.bf_releasebuffer = persistence_pairs_releasebuffer;
+  PyTypeObject *type = (PyTypeObject *) cls.ptr();
+  type->tp_as_buffer = &buffer_procs;
+#if PY_MAJOR_VERSION < 3
+  type->tp_flags |= Py_TPFLAGS_HAVE_NEWBUFFER;
+#endif
+
+  cls
     //No-args constructor
     .def(py::init())
 
-    //This is a method that takes two ints
+    //This is a method that takes two ints. Like the other methods that may resize
+    //the pairs, it raises BufferError while they are exported (see above).
     .def("append_pair",
-         &phat::persistence_pairs::append_pair,
+         [](phat::persistence_pairs &p, phat::index birth, phat::index death) {
+           persistence_pairs_access::check_resizable(p);
+           p.append_pair(birth, death);
+         },
          "Appends a single (birth, death) pair",
          py::arg("birth"), py::arg("death"))
 
@@ -243,26 +467,51 @@ void wrap_persistence_pairs(py::module &m) {
          })
     // \__len\__ and \__getitem\__ together serve to make this a Python iterable
     // so you can do `for i in pairs: blah`. A nicer way is to support \__iter\__,
-    // which we leave for future work.
+    // which we leave for future work. This creates a tuple for every pair, so for
+    // more than a few pairs, `numpy.asarray(pairs)` (see above) is the better choice.
     .def("__getitem__", [](const phat::persistence_pairs &p, int index) {
         phat::index idx = fix_index(p, index);
         return p.get_pair(idx);
-      })
-    .def("clear", &phat::persistence_pairs::clear, "Empties the collection")
+      },
+      "Get a single (birth, death) pair as a tuple. Kept for compatibility: numpy.asarray(pairs) "
+      "gives all of them as an array without creating any tuples")
+    .def("clear", [](phat::persistence_pairs &p) {
+        persistence_pairs_access::check_resizable(p);
+        p.clear();
+      }, "Empties the collection")
     .def("sort", &phat::persistence_pairs::sort, "Sort in place")
+    //Copies all the pairs out in one go, for NumPy (or numba) code that would
+    //otherwise have to fetch them one tuple at a time through \__getitem\__
+    .def("as_array", [](const phat::persistence_pairs &p) {
+        const phat::index nr_pairs = p.get_num_pairs();
+        py::array_t<phat::index> result(std::vector<py::ssize_t>{(py::ssize_t)nr_pairs, 2});
+        auto view = result.mutable_unchecked<2>();
+        for(phat::index i = 0; i < nr_pairs; i++) {
+          std::pair<phat::index, phat::index> pair = p.get_pair(i);
+          view(i, 0) = pair.first;
+          view(i, 1) = pair.second;
+        }
+        return result;
+      }, "Copy the pairs into an (n, 2) NumPy array with one (birth, death) row per pair")
     .def("__eq__", &phat::persistence_pairs::operator==)
     .def("__ne__", [](phat::persistence_pairs &p, phat::persistence_pairs &other) {
         return p != other;
       })
     //#### File operations
-    .def("load_ascii", &phat::persistence_pairs::load_ascii,
-         "Load the contents of a text file into this instance")
+    .def("load_ascii", [](phat::persistence_pairs &p, std::string filename) {
+        persistence_pairs_access::check_resizable(p);
+        return p.load_ascii(filename);
+      },
+      "Load the contents of a text file into this instance")
     .def("save_ascii", &phat::persistence_pairs::save_ascii,
          "Save this instance to a text file")
     .def("save_binary", &phat::persistence_pairs::save_binary,
          "Save the contents of this instance to a binary file")
-    .def("load_binary", &phat::persistence_pairs::load_binary,
-         "Load the contents of a binary file into this instance");
+    .def("load_binary", [](phat::persistence_pairs &p, std::string filename) {
+        persistence_pairs_access::check_resizable(p);
+        return p.load_binary(filename);
+      },
+      "Load the contents of a binary file into this instance");
 }
 
 //## Define the module
@@ -275,6 +524,23 @@ PYBIND11_PLUGIN(_phat) {
   //Wrap the `persistence_pairs` class
   wrap_persistence_pairs(m);
 
+  //#### Threading
+  //These mirror the OpenMP functions of the same names. When PHAT is built without
+  //OpenMP, phat/helpers/misc.h provides stand-ins, so they are always available.
+  //The per-thread pivot columns of a boundary matrix have room for one thread per
+  //processor, so the number of threads is clamped to that. The setting is stored
+  //for all Python threads, see `apply_num_threads` above.
+  m.def("set_num_threads", [](int num_threads) {
+      requested_num_threads = std::max(1, std::min(num_threads, omp_get_num_procs()));
+    },
+    "Set the number of threads used by the parallel reductions",
+    py::arg("num_threads"));
+  m.def("get_max_threads", []() {
+      const int num_threads = requested_num_threads.load();
+      return num_threads > 0 ? num_threads : omp_get_max_threads();
+    },
+    "Get the number of threads the parallel reductions will use");
+
   //#### Generate all the different representations of `boundary_matrix`
   wrap_boundary_matrix<phat::bit_tree_pivot_column>(m, "btpc");
   wrap_boundary_matrix<phat::sparse_pivot_column>(m, "spc");
@@ -284,6 +550,7 @@ PYBIND11_PLUGIN(_phat) {
   wrap_boundary_matrix<phat::vector_heap>(m, "vh");
   wrap_boundary_matrix<phat::vector_set>(m, "vs");
   wrap_boundary_matrix<phat::vector_list>(m, "vl");
+  wrap_boundary_matrix<phat::packed_vector>(m, "pv");
 
   //We're done!
   return m.ptr();
@@ -45,11 +45,8 @@ Now the code::
     # print some information of the boundary matrix:
     print()
     print("The boundary matrix has %d columns:" % len(boundary_matrix.columns))
-    for col in boundary_matrix.columns:
-        s = "Column %d represents a cell of dimension %d." % (col.index, col.dimension)
-        if (col.boundary):
-            s = s + " Its boundary consists of the cells " + " ".join([str(c) for c in col.boundary])
-        print(s)
+    # describe_columns formats all the columns at once, rather than looping over them
+    phat.describe_columns(boundary_matrix)
     print("Overall, the boundary matrix has %d entries." % len(boundary_matrix))
 
     pairs = boundary_matrix.compute_persistence_pairs()
@@ -66,7 +63,11 @@ Please see https://bitbucket.org/phat-code/phat/python for more information.
 """
 
 import _phat
+import collections
+import functools
+import sys
 import enum
+import numpy as np
 
 from _phat import persistence_pairs
 
@@ -75,10 +76,19 @@ from _phat import persistence_pairs
 __all__ = ['boundary_matrix',
            'persistence_pairs',
            'representations',
-           'reductions']
-
-
-class representations(enum.Enum):
+           'reductions',
+           'set_num_threads',
+           'columns_from_filtration',
+           'compute_from_csr',
+           'clear_apparent_pairs',
+           'describe_columns',
+           'pair_lifetimes',
+           'filter_by_persistence',
+           'betti_curve',
+           'sort_pairs']
+
+
+class representations(enum.IntEnum):
     """Available representations for internal storage of columns in
     a `boundary_matrix`
     """
@@ -89,19 +99,46 @@ class representations(enum.Enum):
     vector_heap = 5
     vector_set = 6
     vector_list = 7
+    packed_vector = 8
 
 
-class reductions(enum.Enum):
+class reductions(enum.IntEnum):
     """Available reduction algorithms"""
     twist_reduction = 1
     chunk_reduction = 2
     standard_reduction = 3
     row_reduction = 4
     spectral_sequence_reduction = 5
-
+    parallel_reduction = 6
+
+#The short names are the suffixes used by the _phat module, taken from the leading
+#characters of the words in each name, e.g. 'btpc' for bit_tree_pivot_column.
+#Each enum member carries its own as `short`.
+_SHORT_NAMES = {
+    'bit_tree_pivot_column': 'btpc',
+    'sparse_pivot_column': 'spc',
+    'full_pivot_column': 'fpc',
+    'vector_vector': 'vv',
+    'vector_heap': 'vh',
+    'vector_set': 'vs',
+    'vector_list': 'vl',
+    'packed_vector': 'pv',
+    'twist_reduction': 'tr',
+    'chunk_reduction': 'cr',
+    'standard_reduction': 'sr',
+    'row_reduction': 'rr',
+    'spectral_sequence_reduction': 'ssr',
+    'parallel_reduction': 'pr',
+}
+
+for _member in list(representations) + list(reductions):
+    _member.short = _SHORT_NAMES[_member.name]
+del _member
 
 class column(object):
     """A view on one column of data in a boundary matrix"""
+    __slots__ = ('_matrix', '_index')
+
     def __init__(self, matrix, index):
         """INTERNAL. Columns are created automatically by boundary matrices.
         There is no need to construct them directly"""
@@ -124,19 +161,52 @@ class column(object):
 
     @property
     def boundary(self):
-        """The boundary values in this column, i.e. the other columns that this column is bounded by"""
+        """The boundary values in this column, i.e. the other columns that this column is bounded by.
+
+        New values must be sorted. Assigning a NumPy integer array is the fast path, since it
+        is copied directly from its buffer instead of one element at a time."""
         return self._matrix._matrix.get_col(self._index)
 
     @boundary.setter
     def boundary(self, values):
+        if isinstance(values, np.ndarray):
+            values = np.ascontiguousarray(values, dtype=np.int64)
         return self._matrix._matrix.set_col(self._index, values)
 
     def __str__(self):
         return "(%d, %s)" % (self.dimension, self.boundary)
 
+#A read-only snapshot of a column, see `boundary_matrix.to_records`
+column_record = collections.namedtuple('column_record', 'index dimension boundary')
+
+class _columns_view(object):
+    """INTERNAL. A sequence of the columns in a boundary matrix, which
+    creates `column` objects only when they are requested"""
+    __slots__ = ('_matrix',)
+
+    def __init__(self, matrix):
+        self._matrix = matrix
+
+    def __len__(self):
+        return self._matrix._matrix.get_num_cols()
+
+    def __getitem__(self, index):
+        count = len(self)
+        if isinstance(index, slice):
+            return [column(self._matrix, i) for i in range(*index.indices(count))]
+        if index < 0:
+            index += count
+        if index < 0 or index >= count:
+            raise IndexError("column index out of range")
+        return column(self._matrix, index)
+
+    def __iter__(self):
+        return (column(self._matrix, i) for i in range(len(self)))
+
 class boundary_matrix(object):
     """Boundary matrices that store the shape information of a cell complex.
     """
+    __slots__ = ('_representation', '_matrix')
 
     def __init__(self, representation = representations.bit_tree_pivot_column, source = None, columns = None):
         """
@@ -162,47 +232,134 @@ class boundary_matrix(object):
 
         matrix : boundary_matrix
         """
+        #Members of different IntEnums compare and hash equal, so without this check
+        #e.g. reductions.chunk_reduction would quietly pick the sparse_pivot_column type
+        if not isinstance(representation, representations):
+            raise TypeError("representation must be one of phat.representations, not %r" % (representation,))
         self._representation = representation
-        if source:
+        #Compare with None rather than testing truth: `bool(source)` would call
+        #`len(source)`, which counts every entry in the matrix
+        if source is not None:
             self._matrix = _convert(source, representation)
         else:
             self._matrix = self.__matrix_for_representation(representation)()
-            if columns:
+            if columns is not None:
                 self.columns = columns
 
     @property
     def columns(self):
-        """A collection of column objects"""
-        return [column(self, i) for i in range(self._matrix.get_num_cols())]
+        """A collection of column objects.
+
+        Columns are created lazily as they are accessed, so reading a few
+        columns of a large matrix doesn't create one object per column.
+
+        To load a large matrix whose data is already in NumPy arrays, use
+        `set_columns_csr` rather than assigning to this property."""
+        return _columns_view(self)
 
     @columns.setter
     def columns(self, columns):
-        for col in columns:
-           if not (isinstance(col, column) or isinstance(col, tuple)):
-               raise TypeError("All columns must be column objects, or (dimension, values) tuples")
-        if len(columns) != len(self.dimensions):
-            self._matrix.set_dims([0] * len(columns))
-        for i, col in enumerate(columns):
-            if isinstance(col, column):
-                self._matrix.set_dim(i, col.dimension)
-                self._matrix.set_col(i, col.boundary)
+        #Columns are expected to all be of the same kind, so the type of the first
+        #one decides how to read them all
+        try:
+            if isinstance(columns, _columns_view):
+                #All the columns of another matrix can be fetched in one call
+                boundaries, dimensions = columns._matrix._matrix.get_vector_vector()
+            elif len(columns) == 0:
+                boundaries, dimensions = [], []
+            elif isinstance(columns[0], column):
+                dimensions = [col.dimension for col in columns]
+                boundaries = [col.boundary for col in columns]
+            elif isinstance(columns[0], tuple):
+                dimensions = [dimension for dimension, _ in columns]
+                boundaries = [values for _, values in columns]
             else:
-                dimension, values = col
-                self._matrix.set_dim(i, dimension)
-                self._matrix.set_col(i, values)
+                raise TypeError()
+        except (TypeError, ValueError, AttributeError):
+            raise TypeError("All columns must be column objects, or (dimension, values) tuples")
+        #Hand all the columns to the C++ side in one call, rather than
+        #crossing into _phat twice per column
+        self._matrix.load_vector_vector(boundaries, dimensions)
 
     @property
     def dimensions(self):
-        """A collection of dimensions, equivalent to [c.dimension for c in self.columns]"""
-        return [self._matrix.get_dim(i) for i in range(self._matrix.get_num_cols())]
+        """A NumPy array of dimensions, equivalent to [c.dimension for c in self.columns]"""
+        return self._matrix.get_dims()
 
     @dimensions.setter
     def dimensions(self, dimensions):
         return self._matrix.set_dims(dimensions)
 
+    def set_columns_csr(self, offsets, indices, dims):
+        """Replaces all the columns with ones given as NumPy arrays in compressed sparse form.
+
+        Column ``i`` gets the dimension ``dims[i]`` and the boundary
+        ``indices[offsets[i]:offsets[i + 1]]``, which must be sorted. The arrays are
+        copied straight from their buffers in a single call, so for large matrices
+        this is much faster than assigning to `columns`. They are taken in the same
+        order as by `compute_from_csr`.
+
+        Parameters
+        ----------
+
+        offsets : integer array
+            Where each column starts in `indices`, plus a final entry for the end
+            of the last column, so it has one entry more than `dims`.
+        indices : integer array
+            The boundary entries of all the columns, one column after the other.
+            A ``uint32`` array is read as it is, without converting it to 64 bit
+            integers first.
+        dims : integer array
+            The dimension of each column.
+        """
+        if isinstance(indices, np.ndarray) and indices.dtype == np.uint32:
+            self._matrix.load_csr_u32(offsets, indices, dims)
+        else:
+            self._matrix.load_csr(offsets, indices, dims)
+
+    def to_csr(self, index_dtype=np.int64):
+        """Copies all the columns out into NumPy arrays in compressed sparse form.
+
+        Parameters
+        ----------
+
+        index_dtype : ``numpy.int64`` (default) or ``numpy.uint32``
+            The integer type of the returned `indices`. ``uint32`` halves their
+            size, and is possible as long as the matrix has at most 2**32 columns.
+
+        Returns
+        -------
+
+        (offsets, indices, dims) : tuple of NumPy arrays
+            Column ``i`` has dimension ``dims[i]`` and the boundary
+            ``indices[offsets[i]:offsets[i + 1]]``. This is the same layout that
+            `set_columns_csr` and `compute_from_csr` accept, and
+            ``numpy.diff(offsets)`` gives the size of each boundary.
+        """
+        index_dtype = np.dtype(index_dtype)
+        if index_dtype == np.int64:
+            return self._matrix.get_csr()
+        if index_dtype == np.uint32:
+            return self._matrix.get_csr_u32()
+        raise ValueError("index_dtype must be int64 or uint32, not %s" % index_dtype)
+
+    def to_records(self):
+        """Copies out all the columns as a list of (index, dimension, boundary) named tuples.
+
+        All the data is fetched in a single call, so this is the preferred way to read
+        every column. Reading ``dimension`` and ``boundary`` from the `column` objects
+        in `columns` fetches one value per access, so those are better kept for
+        changing individual columns in place.
+        """
+        boundaries, dimensions = self._matrix.get_vector_vector()
+        return [column_record(i, dimension, boundary)
+                for i, (dimension, boundary) in enumerate(zip(dimensions, boundaries))]
+
     def __matrix_for_representation(self, representation):
-        short_name = _short_name(representation.name)
-        return getattr(_phat, "boundary_matrix_" + short_name)
+        try:
+            return _MATRIX_TYPES[representation]
+        except KeyError:
+            raise ValueError("The %s representation is not available in this build of PHAT" % representation.name)
 
     def __eq__(self, other):
         return self._matrix == other._matrix
@@ -217,15 +374,15 @@ class boundary_matrix(object):
 
     #Pickle support
     def __getstate__(self):
-        (dimensions, columns) = self._matrix.get_vector_vector()
+        (columns, dimensions) = self._matrix.get_vector_vector()
         return (self._representation, dimensions, columns)
 
     #Pickle support
     def __setstate__(self, state):
-        presentation, dimensions, columns = state
+        representation, dimensions, columns = state
         self._representation = representation
-        self._matrix = self.__matrix_for_representation(representation)
-        self._matrix.set_vector_vector(dimensions, columns)
+        self._matrix = self.__matrix_for_representation(representation)()
+        self._matrix.load_vector_vector(columns, dimensions)
 
     def load(self, file_name, mode = 'b'):
         """Load this boundary matrix from a file
@@ -278,44 +435,493 @@ class boundary_matrix(object):
             raise ValueError("Only 'b' - binary and 't' - text modes are supported")
 
     def compute_persistence_pairs(self,
-                                reduction = reductions.twist_reduction):
-        """Computes persistence pairs (birth, death) for the given boundary matrix."""
-        representation_short_name = _short_name(self._representation.name)
-        algo_name = reduction.name
-        algo_short_name = _short_name(algo_name)
-        #Look up an implementation that matches the requested characteristics
-        #in the _phat module
-        function = getattr(_phat, "compute_persistence_pairs_" + representation_short_name + "_" + algo_short_name)
+                                reduction = None,
+                                threads = None,
+                                use_clearing = False):
+        """Computes persistence pairs (birth, death) for the given boundary matrix.
+
+        Parameters
+        ----------
+
+        reduction : phat.reductions, optional
+            The reduction algorithm to use. Defaults to ``twist_reduction``, or to
+            ``chunk_reduction`` when more than one thread is requested, since the
+            chunk algorithm is the one that makes use of multiple threads.
+        threads : int, optional
+            If provided, calls `set_num_threads` with this value before the
+            reduction starts. See `set_num_threads` for details.
+        use_clearing : bool, optional
+            If true, first empties the columns that belong to apparent pairs,
+            using `clear_apparent_pairs`, so the reduction doesn't have to.
+
+        Returns
+        -------
+
+        pairs : persistence_pairs
+
+        The reduction runs without holding the GIL, so other Python threads can
+        carry on meanwhile, e.g. reducing other matrices. The matrix is reduced in
+        place, so another thread must not read or change it until this returns:
+        that includes converting, cloning or saving it.
+        """
+        reduction = _prepare_reduction(reduction, threads)
+        if use_clearing:
+            clear_apparent_pairs(self)
+        try:
+            function = _COMPUTE[self._representation][reduction]
+        except KeyError:
+            raise _unavailable(self._representation, reduction)
         return function(self._matrix)
 
     def compute_persistence_pairs_dualized(self, 
-                                        reduction = reductions.twist_reduction):
-        """Computes persistence pairs (birth, death) from the dualized form of the given boundary matrix."""
-        representation_short_name = _short_name(self._representation.name)
-        algo_name = reduction.name
-        algo_short_name = _short_name(algo_name)
-        #Look up an implementation that matches the requested characteristics
-        #in the _phat module
-        function = getattr(_phat, "compute_persistence_pairs_dualized_" + representation_short_name + "_" + algo_short_name)
+                                        reduction = None,
+                                        threads = None):
+        """Computes persistence pairs (birth, death) from the dualized form of the given boundary matrix.
+
+        The `reduction` and `threads` parameters behave as in `compute_persistence_pairs`."""
+        reduction = _prepare_reduction(reduction, threads)
+        try:
+            function = _COMPUTE_DUALIZED[self._representation][reduction]
+        except KeyError:
+            raise _unavailable(self._representation, reduction)
         return function(self._matrix)
 
     def convert(self, representation):
         """Copy this matrix to another with a different representation"""
         return boundary_matrix(representation, self)
 
-def _short_name(name):
-    """An internal API that takes leading characters from words
-    For instance, 'bit_tree_pivot_column' becomes 'btpc'
+    def clone(self):
+        """Copy this matrix to another with the same representation.
+
+        The columns are copied directly in C++, which is cheaper than a conversion.
+        Like a reduction, the copy runs without holding the GIL, so the matrix must
+        not be reduced or changed by another thread meanwhile."""
+        matrix = boundary_matrix.__new__(boundary_matrix)
+        matrix._representation = self._representation
+        matrix._matrix = self._matrix.clone()
+        return matrix
+
+def compute_from_csr(indptr, indices, dims,
+                     representation = representations.bit_tree_pivot_column,
+                     reduction = None,
+                     threads = None):
+    """Computes persistence pairs (birth, death) for a boundary matrix held in NumPy arrays.
+
+    This is the recommended path for large filtrations: the arrays are copied
+    into PHAT directly, without building Python lists for the columns first.
+
+    Parameters
+    ----------
+
+    indptr : integer array
+        Column offsets. The boundary of column ``i`` is ``indices[indptr[i]:indptr[i + 1]]``,
+        which is the layout of ``scipy.sparse.csc_matrix``.
+    indices : integer array
+        The boundary entries of all the columns, each column sorted in increasing order.
+    dims : integer array
+        The dimension of each column. Must have one entry less than `indptr`.
+    representation : phat.representations, optional
+        The type of column storage to use for the reduction.
+    reduction, threads : optional
+        As for `boundary_matrix.compute_persistence_pairs`.
+
+    Returns
+    -------
+
+    pairs : persistence_pairs
+    """
+    matrix = boundary_matrix(representation)
+    matrix.set_columns_csr(indptr, indices, dims)
+    return matrix.compute_persistence_pairs(reduction, threads)
+
+def clear_apparent_pairs(matrix):
+    """Empties the columns that the reduction of `matrix` would empty anyway,
+    because they are the births of apparent pairs.
+
+    A column ``j`` whose lowest entry is ``i`` forms an apparent pair ``(i, j)`` if
+    ``j`` is also the first column with an entry in row ``i``. No column before
+    ``j`` can then be reduced to have its lowest entry in row ``i``, so ``(i, j)``
+    is a persistence pair, and column ``i`` reduces to zero. Emptying it up front
+    leaves the persistence pairs unchanged, and saves the work of reducing it.
+
+    Parameters
+    ----------
+
+    matrix : boundary_matrix
+        Changed in place.
+
+    Returns
+    -------
+
+    cleared : boolean array
+        True for the columns that are births of apparent pairs.
+
+    The search for apparent pairs is compiled with numba, when it is installed.
+    """
+    offsets, indices, dims = matrix.to_csr()
+    cleared = _apparent_births(offsets, indices)
+    if cleared.any():
+        sizes = np.diff(offsets)
+        keep = np.repeat(~cleared, sizes)
+        sizes[cleared] = 0
+        offsets = np.zeros(len(dims) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        matrix.set_columns_csr(offsets, indices[keep], dims)
+    return cleared
+
+def describe_columns(matrix, file=None):
+    """Writes a line of text for each column of `matrix`, giving its dimension
+    and boundary, e.g. ``Column 2 represents a cell of dimension 1. Its boundary
+    consists of the cells 0 1``.
+
+    The columns are taken out with `to_csr`, and the text is laid out with NumPy
+    and written in a single call, which is faster than formatting and printing one
+    column at a time.
+
+    Parameters
+    ----------
+
+    matrix : boundary_matrix
+    file : file-like object, optional
+        Where to write the description. Defaults to ``sys.stdout``.
     """
-    return "".join([n[0] for n in name.split("_")])
+    offsets, indices, dims = matrix.to_csr()
+    num_cols = len(dims)
+    if num_cols == 0:
+        return
+    sizes = np.diff(offsets)
+
+    has_boundary = (sizes > 0).tolist()
+    heads = [("Column %d represents a cell of dimension %d. Its boundary consists of the cells"
+              if boundary else "Column %d represents a cell of dimension %d.") % (i, dim)
+             for i, (dim, boundary) in enumerate(zip(dims.tolist(), has_boundary))]
+
+    #Every column becomes its head, one token per boundary entry, and a line break,
+    #laid out one column after the other, so they can all be joined in one go
+    tokens = np.empty(len(indices) + 2 * num_cols, dtype=object)
+    starts = offsets[:-1] + 2 * np.arange(num_cols)
+    ends = starts + sizes + 1
+    tokens[starts] = heads
+    tokens[ends] = "\n"
+    entries = np.ones(len(tokens), dtype=bool)
+    entries[starts] = False
+    entries[ends] = False
+    tokens[entries] = [" %d" % entry for entry in indices.tolist()]
+
+    (file or sys.stdout).write("".join(tokens))
+
+def set_num_threads(num_threads):
+    """Set the number of threads used by the parallel reductions (chunk, spectral
+    sequence and parallel).
+
+    The setting is global: it stays in effect for all later reductions, not just
+    the next one, whichever Python thread they are started from. (OpenMP's own
+    ``omp_set_num_threads`` only affects the calling thread, so each reduction
+    applies the setting on the thread it runs on.) At most one thread per
+    processor is used. It has no effect if PHAT was built without OpenMP support.
+    """
+    _phat.set_num_threads(num_threads)
+
+def columns_from_filtration(simplices):
+    """Builds the columns of a boundary matrix from a filtered simplicial complex.
+
+    Parameters
+    ----------
+
+    simplices : sequence of vertex sequences, or 2D integer array
+        The simplices of the complex in filtration order, each given by its
+        vertices. Every face of a simplex must come before the simplex itself.
+        In a 2D array, each row is a simplex, padded with -1 on the right.
+
+    Returns
+    -------
+
+    columns : list of (dimension, boundary) tuples
+        Ready to be used as ``boundary_matrix(columns = ...)``
+
+    The face lookups are compiled with numba, when it is installed.
+    """
+    if len(simplices) == 0:
+        return []
+    if isinstance(simplices, np.ndarray):
+        vertices = np.array(simplices, dtype=np.int64, ndmin=2)
+    else:
+        width = max([len(simplex) for simplex in simplices] or [0])
+        vertices = np.full((len(simplices), width), -1, dtype=np.int64)
+        for i, simplex in enumerate(simplices):
+            vertices[i, :len(simplex)] = simplex
+    #Sort the vertices of each simplex, keeping the -1 padding on the right
+    padding = vertices < 0
+    vertices[padding] = np.iinfo(np.int64).max
+    vertices.sort(axis=1)
+    vertices[vertices == np.iinfo(np.int64).max] = -1
+    dims = vertices.shape[1] - padding.sum(axis=1) - 1
+
+    sizes = np.where(dims > 0, dims + 1, 0)
+    offsets = np.zeros(len(dims) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    order = np.lexsort(vertices.T[::-1])
+    indices = _boundary_indices(vertices, dims, order, offsets)
+
+    if (indices < 0).any():
+        raise ValueError("Every face of a simplex must also be in the filtration")
+    if (indices >= np.repeat(np.arange(len(dims)), sizes)).any():
+        raise ValueError("Every face of a simplex must come before the simplex in the filtration")
+    return [(int(dims[i]), indices[offsets[i]:offsets[i + 1]].tolist()) for i in range(len(dims))]
+
+def pair_lifetimes(pairs, values=None):
+    """Computes how long each persistence pair lives.
+
+    Parameters
+    ----------
+
+    pairs : persistence_pairs, or (n, 2) integer array of (birth, death) rows
+
+    values : 1D array, optional
+        The filtration value of each column. Without it, lifetimes are measured
+        in column indices.
+
+    Returns
+    -------
+
+    lifetimes : 1D array
+        ``death - birth`` for every pair, in the same order as `pairs`
+    """
+    pairs = _pairs_array(pairs)
+    if values is None:
+        return pairs[:, 1] - pairs[:, 0]
+    values = np.asarray(values)
+    return values[pairs[:, 1]] - values[pairs[:, 0]]
+
+def filter_by_persistence(pairs, min_persistence, values=None):
+    """Keeps only the persistence pairs that live at least `min_persistence`.
+
+    `pairs` and `values` are as for `pair_lifetimes`. Returns the remaining pairs
+    as an (n, 2) array, in their original order.
+    """
+    pairs = _pairs_array(pairs)
+    return pairs[pair_lifetimes(pairs, values) >= min_persistence]
+
+def betti_curve(pairs, dims):
+    """Computes the Betti numbers of every step of the filtration.
+
+    Parameters
+    ----------
+
+    pairs : persistence_pairs, or (n, 2) integer array of (birth, death) rows
+        As returned by `compute_persistence_pairs` for the matrix.
+
+    dims : 1D integer array
+        The dimension of each column, like `boundary_matrix.dimensions`.
+
+    Returns
+    -------
+
+    curve : 2D array
+        ``curve[d, j]`` is the ``d``-th Betti number of the complex made of the
+        columns ``0`` to ``j``.
+
+    The curve is computed with numba, when it is installed.
+    """
+    pairs = _pairs_array(pairs)
+    dims = np.ascontiguousarray(dims, dtype=np.int64)
+    num_dims = int(dims.max()) + 1 if len(dims) else 0
+    return _betti_curve(np.ascontiguousarray(pairs[:, 0]),
+                        np.ascontiguousarray(pairs[:, 1]),
+                        dims, num_dims)
+
+def sort_pairs(pairs):
+    """Sorts persistence pairs by birth, and then by death.
+
+    This is the array counterpart of `persistence_pairs.sort`, for pairs that
+    have already been taken out as an array, e.g. by `filter_by_persistence`.
+
+    Parameters
+    ----------
+
+    pairs : persistence_pairs, or (n, 2) integer array of (birth, death) rows
+
+    Returns
+    -------
+
+    sorted : (n, 2) array
+    """
+    pairs = _pairs_array(pairs)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+def _pairs_array(pairs):
+    """Internal - persistence pairs as an (n, 2) int64 array. For a
+    `persistence_pairs` object, this is a read only view, not a copy."""
+    return np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+
+#numba is optional. Without it, the helpers that work on NumPy arrays run as
+#plain Python. Importing numba takes much longer than importing phat, so it
+#is only imported once one of those helpers is first called.
+_JITTED = []
+
+_prange = range
+
+def _jit(**options):
+    """Internal - compiles a function with numba when it is installed, and
+    otherwise leaves it as plain Python. Nothing is imported or compiled until
+    the function is first called, see `_resolve_jitted`."""
+    def decorate(function):
+        _JITTED.append((function, options))
+        @functools.wraps(function)
+        def first_call(*args):
+            _resolve_jitted()
+            return globals()[function.__name__](*args)
+        return first_call
+    return decorate
+
+def _resolve_jitted():
+    """Internal - imports numba, and replaces every function decorated with `_jit`
+    by its numba version, or by the plain function if numba isn't installed.
+    They are all replaced at once, so that they can call one another."""
+    global _prange
+    try:
+        import numba
+    except ImportError:
+        numba = None
+    module = globals()
+    if numba is not None:
+        _prange = numba.prange
+    for function, options in _JITTED:
+        module[function.__name__] = numba.njit(**options)(function) if numba is not None else function
+
+@_jit(cache=True)
+def _find_row(vertices, order, row):
+    """Internal - binary search for `row` among the lexicographically ordered
+    rows of `vertices`. Returns its index, or -1 if it isn't there."""
+    low = 0
+    high = len(order)
+    while low < high:
+        middle = (low + high) // 2
+        candidate = order[middle]
+        comparison = 0
+        for j in range(vertices.shape[1]):
+            if vertices[candidate, j] != row[j]:
+                comparison = -1 if vertices[candidate, j] < row[j] else 1
+                break
+        if comparison == 0:
+            return candidate
+        if comparison < 0:
+            low = middle + 1
+        else:
+            high = middle
+    return -1
+
+@_jit(parallel=True, cache=True)
+def _boundary_indices(vertices, dims, order, offsets):
+    """Internal - finds the facets of every simplex, filling the boundary
+    indices of the columns in compressed sparse column form"""
+    indices = np.empty(offsets[-1], dtype=np.int64)
+    width = vertices.shape[1]
+    for i in _prange(len(dims)):
+        face = np.empty(width, dtype=np.int64)
+        for dropped in range(offsets[i + 1] - offsets[i]):
+            k = 0
+            for j in range(dims[i] + 1):
+                if j != dropped:
+                    face[k] = vertices[i, j]
+                    k += 1
+            for j in range(k, width):
+                face[j] = -1
+            indices[offsets[i] + dropped] = _find_row(vertices, order, face)
+        indices[offsets[i]:offsets[i + 1]].sort()
+    return indices
+
+@_jit(parallel=True, cache=True)
+def _betti_curve(births, deaths, dims, num_dims):
+    """Internal - counts the classes of each dimension alive after each column.
+    Every column creates a class of its own dimension, unless it is a death,
+    in which case it destroys a class of the dimension of its birth."""
+    step = np.ones(len(dims), dtype=np.int64)
+    changed = dims.copy()
+    for k in range(len(births)):
+        step[deaths[k]] = -1
+        changed[deaths[k]] = dims[births[k]]
+    curve = np.zeros((num_dims, len(dims)), dtype=np.int64)
+    for d in _prange(num_dims):
+        betti = 0
+        for j in range(len(dims)):
+            if changed[j] == d:
+                betti += step[j]
+            curve[d, j] = betti
+    return curve
+
+@_jit(parallel=True, cache=True)
+def _apparent_births(offsets, indices):
+    """Internal - marks the rows ``i`` of apparent pairs ``(i, j)``: the lowest entry
+    of column ``j`` is in row ``i``, and ``j`` is the first column with an entry in row ``i``"""
+    num_cols = len(offsets) - 1
+    first_column = np.full(num_cols, num_cols, dtype=np.int64)
+    for j in range(num_cols):
+        for k in range(offsets[j], offsets[j + 1]):
+            if first_column[indices[k]] == num_cols:
+                first_column[indices[k]] = j
+    cleared = np.zeros(num_cols, dtype=np.bool_)
+    for j in _prange(num_cols):
+        if offsets[j + 1] > offsets[j]:
+            lowest = indices[offsets[j + 1] - 1]
+            if first_column[lowest] == j:
+                cleared[lowest] = True
+    return cleared
+
+def _prepare_reduction(reduction, threads):
+    """Internal - applies the `threads` setting, and picks the default reduction for it"""
+    #As in boundary_matrix.__init__: a member of another IntEnum, or a plain int,
+    #would otherwise select whichever reduction has the same value
+    if reduction is not None and not isinstance(reduction, reductions):
+        raise TypeError("reduction must be one of phat.reductions, not %r" % (reduction,))
+    if threads is not None:
+        set_num_threads(threads)
+    if reduction is None:
+        if threads is not None and threads > 1:
+            return reductions.chunk_reduction
+        return reductions.twist_reduction
+    return reduction
+
+def _unavailable(representation, reduction):
+    """Internal - the error for a reduction that _phat doesn't provide for a representation"""
+    return ValueError("The %s reduction is not available for the %s representation in this build of PHAT"
+                      % (reduction.name, representation.name))
 
 def _convert(source, to_representation):
     """Internal - function to convert from one `boundary_matrix` implementation to another"""
-    class_name = source._representation.name
-    source_rep_short_name = _short_name(class_name)
-    to_rep_short_name = _short_name(to_representation.name)
-    function = getattr(_phat, "convert_%s_to_%s" % (source_rep_short_name, to_rep_short_name))
+    try:
+        function = _CONVERT[source._representation][to_representation]
+    except KeyError:
+        raise ValueError("Conversion from %s to %s is not available in this build of PHAT"
+                         % (source._representation.name, to_representation.name))
     return function(source._matrix)
 
-
-
+def _resolve(names):
+    """Internal - maps each key of `names` to the _phat function with the given name.
+    Keys whose function is not part of this build of _phat are left out."""
+    table = {}
+    for key, name in names.items():
+        function = getattr(_phat, name, None)
+        if function is not None:
+            table[key] = function
+    return table
+
+#Dispatch tables for the _phat implementations, resolved once at import time
+#so that the names of the matching functions don't have to be rebuilt and
+#looked up on every call. The tables for reductions and conversions are nested
+#by representation, so a lookup doesn't need to build a tuple key. The enums are
+#IntEnums, so their members hash and compare like plain ints in these lookups.
+_MATRIX_TYPES = _resolve(dict((rep, "boundary_matrix_" + rep.short)
+                              for rep in representations))
+
+_COMPUTE = dict((rep, _resolve(dict((red, "compute_persistence_pairs_%s_%s" % (rep.short, red.short))
+                                    for red in reductions)))
+                for rep in representations)
+
+_COMPUTE_DUALIZED = dict((rep, _resolve(dict((red, "compute_persistence_pairs_dualized_%s_%s" % (rep.short, red.short))
+                                             for red in reductions)))
+                         for rep in representations)
+
+_CONVERT = dict((source, _resolve(dict((target, "convert_%s_to_%s" % (source.short, target.short))
+                                       for target in representations)))
+                for source in representations)
@@ -1,5 +1,7 @@
 from __future__ import print_function
 import sys
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 import phat
 
 if __name__=='__main__':
@@ -15,41 +17,42 @@ if __name__=='__main__':
 
     error = False
 
-    def compute_chunked(mat):
-        return mat.compute_persistence_pairs(phat.reductions.chunk_reduction)
+    def run(job):
+        _, reduction, mat = job
+        return mat.compute_persistence_pairs(reduction)
+
+    # The reductions release the GIL, and each one works on its own copy of the
+    # matrix, so a thread pool runs them side by side. The names are printed up
+    # front, so that the output isn't interleaved. Every reduction may start an
+    # OpenMP team of its own, so the processors are shared out between the workers.
+    def run_all(jobs):
+        for name, _, _ in jobs:
+            print("Running %s ..." % name)
+        workers = min(len(jobs), cpu_count())
+        phat.set_num_threads(max(1, cpu_count() // workers))
+        pool = ThreadPool(workers)
+        try:
+            return pool.map(run, jobs)
+        finally:
+            pool.close()
 
-    print("Comparing representations using Chunk algorithm ...")
-    print("Running Chunk - Sparse ...")
-    sparse_boundary_matrix = phat.boundary_matrix(phat.representations.sparse_pivot_column, boundary_matrix)
-    sparse_pairs = compute_chunked(sparse_boundary_matrix)
-
-    print("Running Chunk - Heap ...")
-    heap_boundary_matrix = phat.boundary_matrix(phat.representations.vector_heap, boundary_matrix)
-    heap_pairs = compute_chunked(heap_boundary_matrix)
-
-    print("Running Chunk - Full ...")
-    full_boundary_matrix = phat.boundary_matrix(phat.representations.full_pivot_column, boundary_matrix)
-    full_pairs = compute_chunked(full_boundary_matrix)
-
-    print("Running Chunk - BitTree ...")
-    bit_tree_boundary_matrix = phat.boundary_matrix(phat.representations.bit_tree_pivot_column, boundary_matrix)
-    bit_tree_pairs = compute_chunked(bit_tree_boundary_matrix)
-
-    print("Running Chunk - Vec_vec ...")
-    vec_vec_boundary_matrix = phat.boundary_matrix(phat.representations.vector_vector, boundary_matrix)
-    vec_vec_pairs = compute_chunked(vec_vec_boundary_matrix)
-
-    print("Running Chunk - Vec_heap ...")
-    vec_heap_boundary_matrix = phat.boundary_matrix(phat.representations.vector_heap, boundary_matrix)
-    vec_heap_pairs = compute_chunked(vec_heap_boundary_matrix)
-
-    print("Running Chunk - Vec_set ...")
-    vec_set_boundary_matrix = phat.boundary_matrix(phat.representations.vector_set, boundary_matrix)
-    vec_set_pairs = compute_chunked(vec_set_boundary_matrix)
+    reps = phat.representations
+    reds = phat.reductions
 
-    print("Running Chunk - Vec_list ...")
-    vec_list_boundary_matrix = phat.boundary_matrix(phat.representations.vector_list, boundary_matrix)
-    vec_list_pairs = compute_chunked(vec_list_boundary_matrix)
+    print("Comparing representations using Chunk algorithm ...")
+    representations = [("Chunk - Sparse", reps.sparse_pivot_column),
+                       ("Chunk - Heap", reps.vector_heap),
+                       ("Chunk - Full", reps.full_pivot_column),
+                       ("Chunk - BitTree", reps.bit_tree_pivot_column),
+                       ("Chunk - Vec_vec", reps.vector_vector),
+                       ("Chunk - Vec_heap", reps.vector_heap),
+                       ("Chunk - Vec_set", reps.vector_set),
+                       ("Chunk - Vec_list", reps.vector_list),
+                       ("Chunk - Packed_vec", reps.packed_vector)]
+    matrices = [phat.boundary_matrix(rep, boundary_matrix) for _, rep in representations]
+    (sparse_pairs, heap_pairs, full_pairs, bit_tree_pairs, vec_vec_pairs,
+     vec_heap_pairs, vec_set_pairs, vec_list_pairs, packed_vec_pairs) = \
+        run_all([(name, reds.chunk_reduction, mat) for (name, _), mat in zip(representations, matrices)])
 
     if sparse_pairs != heap_pairs:
         print("Error: sparse and heap differ!", file=sys.stderr)
@@ -72,8 +75,11 @@ if __name__=='__main__':
     if bit_tree_pairs != vec_list_pairs:
         print("Error: bit_tree and vec_list differ!", file=sys.stderr)
         error = True
-    if vec_list_pairs != sparse_pairs:
-        print("Error: vec_list and sparse differ!", file=sys.stderr)
+    if vec_list_pairs != packed_vec_pairs:
+        print("Error: vec_list and packed_vec differ!", file=sys.stderr)
+        error = True
+    if packed_vec_pairs != sparse_pairs:
+        print("Error: packed_vec and sparse differ!", file=sys.stderr)
         error = True
     if error:
         sys.exit(1)
@@ -81,34 +87,17 @@ if __name__=='__main__':
         print("All results are identical (as they should be)")
 
     print("Comparing algorithms using BitTree representation ...")
-    print("Running Twist - BitTree ...")
-
-    def bit_tree_mat():
-        return phat.boundary_matrix(phat.representations.bit_tree_pivot_column, boundary_matrix)
-
-    reps = phat.representations
-    reds = phat.reductions
-    def pairs(mat, red):
-        return mat.compute_persistence_pairs(red)
-
-    twist_boundary_matrix = bit_tree_mat()
-    twist_pairs = pairs(twist_boundary_matrix, reds.twist_reduction)
-
-    print("Running Standard - BitTree ...")
-    std_boundary_matrix = bit_tree_mat()
-    std_pairs = pairs(std_boundary_matrix, reds.standard_reduction)
-
-    print("Running Chunk - BitTree ...")
-    chunk_boundary_matrix = bit_tree_mat()
-    chunk_pairs = pairs(chunk_boundary_matrix, reds.chunk_reduction)
-
-    print("Running Row - BitTree ...")
-    row_boundary_matrix = bit_tree_mat()
-    row_pairs = pairs(row_boundary_matrix, reds.row_reduction)
-
-    print("Running Spectral sequence - BitTree ...")
-    ss_boundary_matrix = bit_tree_mat()
-    ss_pairs = pairs(ss_boundary_matrix, reds.spectral_sequence_reduction)
+    algorithms = [("Twist - BitTree", reds.twist_reduction),
+                  ("Standard - BitTree", reds.standard_reduction),
+                  ("Chunk - BitTree", reds.chunk_reduction),
+                  ("Row - BitTree", reds.row_reduction),
+                  ("Spectral sequence - BitTree", reds.spectral_sequence_reduction),
+                  ("Parallel - BitTree", reds.parallel_reduction)]
+    # Convert once, and give each algorithm a clone of that
+    bit_tree_boundary_matrix = phat.boundary_matrix(reps.bit_tree_pivot_column, boundary_matrix)
+    matrices = [bit_tree_boundary_matrix.clone() for _ in algorithms]
+    twist_pairs, std_pairs, chunk_pairs, row_pairs, ss_pairs, parallel_pairs = \
+        run_all([(name, reduction, mat) for (name, reduction), mat in zip(algorithms, matrices)])
 
     if twist_pairs != std_pairs:
         print("Error: twist and standard differ!", file=sys.stderr)
@@ -122,8 +111,11 @@ if __name__=='__main__':
     if row_pairs != ss_pairs:
         print("Error: row and spectral sequence differ!", file=sys.stderr)
         error = True
-    if ss_pairs != twist_pairs:
-        print("Error: spectral sequence and twist differ!", file=sys.stderr)
+    if ss_pairs != parallel_pairs:
+        print("Error: spectral sequence and parallel differ!", file=sys.stderr)
+        error = True
+    if parallel_pairs != twist_pairs:
+        print("Error: parallel and twist differ!", file=sys.stderr)
         error = True
     if error:
         sys.exit(1)
@@ -19,6 +19,7 @@ if __name__ == "__main__":
 
 """)
 
+    import numpy as np
     import phat
 
     # define a boundary matrix with the chosen internal representation
@@ -38,11 +39,8 @@ if __name__ == "__main__":
 
     # print some information of the boundary matrix:
     print("\nThe boundary matrix has %d columns:" % len(boundary_matrix.columns))
-    for col in boundary_matrix.columns:
-        s = "Column %d represents a cell of dimension %d." % (col.index, col.dimension)
-        if (col.boundary):
-            s = s + " Its boundary consists of the cells " + " ".join([str(c) for c in col.boundary])
-        print(s)
+    # describe_columns formats all the columns at once, rather than looping over them
+    phat.describe_columns(boundary_matrix)
     print("Overall, the boundary matrix has %d entries." % len(boundary_matrix))
 
     pairs = boundary_matrix.compute_persistence_pairs()
@@ -50,6 +48,7 @@ if __name__ == "__main__":
     pairs.sort()
 
     print("\nThere are %d persistence pairs: " % len(pairs))
-    for pair in pairs:
-        print("Birth: %d, Death: %d" % pair)
+    # numpy.asarray views the pairs in place, as rows of an (n, 2) array
+    for birth, death in np.asarray(pairs):
+        print("Birth: %d, Death: %d" % (birth, death))
 
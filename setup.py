@@ -1,7 +1,9 @@
 from setuptools import setup, Extension, find_packages
 from setuptools.command.build_ext import build_ext
 import sys
+import os
 import os.path
+import subprocess
 from io import open
 
 if sys.version_info < (2, 7, 12):
@@ -27,24 +29,90 @@ with open(os.path.join(here, 'python', 'README.rst'), encoding = 'utf8') as f:
 class BuildExt(build_ext):
     """A custom build extension for adding compiler-specific options."""
     c_opts = {
-        'msvc': ['/EHsc'],
-        'unix': ['-std=c++11'],
+        'msvc': ['/EHsc', '/openmp', '/O2', '/DNDEBUG'],
+        'unix': ['-std=c++11', '-O3', '-DNDEBUG', '-funroll-loops', '-fvisibility=hidden'],
     }
+    l_opts = {
+        'msvc': [],
+        'unix': [],
+    }
+
+    # PHAT_NATIVE=1 tunes the build for the processor it runs on, and enables
+    # link time optimization. The result may not run on other machines, so this
+    # is off by default, and should not be used for wheels that get distributed.
+    if os.environ.get('PHAT_NATIVE') == '1':
+        c_opts['msvc'] += ['/GL']
+        l_opts['msvc'] += ['/LTCG']
+        c_opts['unix'] += ['-march=native', '-flto']
+        l_opts['unix'] += ['-flto']
 
     if sys.platform == 'darwin':
         c_opts['unix'] += ['-stdlib=libc++', '-mmacosx-version-min=10.7']
+    else:
+        # OpenMP lets the chunk and spectral sequence reductions use several threads.
+        # Apple's clang doesn't ship with OpenMP, so it is only enabled elsewhere.
+        c_opts['unix'] += ['-fopenmp']
+        l_opts['unix'] += ['-fopenmp']
 
     def build_extensions(self):
         ct = self.compiler.compiler_type
         opts = self.c_opts.get(ct, [])
+        link_opts = self.l_opts.get(ct, [])
         import pybind11
         for ext in self.extensions:
             ext.extra_compile_args = opts
+            ext.extra_link_args = link_opts
             ext.include_dirs.append(pybind11.get_include())
             ext.include_dirs.append(pybind11.get_include(user=True))
+        if os.environ.get('PHAT_PGO') == '1':
+            if ct != 'unix' or not self.compiler_is_gcc():
+                raise RuntimeError("PHAT_PGO=1 is only supported with GCC")
+            self.build_with_profile(opts, link_opts)
+        else:
+            build_ext.build_extensions(self)
+
+    def compiler_is_gcc(self):
+        """Checks that the compiler really is GCC, from the macros its preprocessor defines.
+        Clang also has the 'unix' compiler type, and is often installed as gcc, but its
+        -fprofile-use wants a merged .profdata file rather than the directory that
+        build_with_profile gives it."""
+        # Keep wrappers such as `ccache gcc`, and leave out the flags that follow
+        command = []
+        for arg in self.compiler.compiler_so:
+            if arg.startswith('-'):
+                break
+            command.append(arg)
+        try:
+            macros = subprocess.check_output(command + ['-dM', '-E', '-x', 'c++', os.devnull],
+                                             stderr=subprocess.STDOUT)
+        except (OSError, subprocess.CalledProcessError):
+            return False
+        macros = macros.decode('utf8', 'replace').split()
+        return ('__GNUC__' in macros and '__clang__' not in macros
+                and '__INTEL_COMPILER' not in macros)
+
+    def build_with_profile(self, opts, link_opts):
+        """Profile guided optimization: builds an instrumented extension, runs the
+        self test with it to record a profile, and builds again using the profile."""
+        profile_dir = os.path.abspath(os.path.join(self.build_temp, 'pgo'))
+        self.force = True
+        for ext in self.extensions:
+            ext.extra_compile_args = opts + ['-fprofile-generate=' + profile_dir]
+            ext.extra_link_args = link_opts + ['-fprofile-generate=' + profile_dir]
+        build_ext.build_extensions(self)
+
+        ext_dir = os.path.dirname(os.path.abspath(self.get_ext_fullpath('_phat')))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([ext_dir, os.path.join(here, 'python')])
+        subprocess.check_call([sys.executable, 'self_test.py', os.path.join(here, 'examples', 'torus.bin')],
+                              cwd=os.path.join(here, 'python', 'src'), env=env)
+
+        for ext in self.extensions:
+            ext.extra_compile_args = opts + ['-fprofile-use=' + profile_dir, '-fprofile-correction']
+            ext.extra_link_args = link_opts
         build_ext.build_extensions(self)
 
-requires = ['pybind11']
+requires = ['pybind11', 'numpy']
 
 if sys.version_info < (3,4,0):
     requires.append('enum34')
@@ -26,12 +26,14 @@
 #include <phat/representations/heap_pivot_column.h>
 #include <phat/representations/full_pivot_column.h>
 #include <phat/representations/bit_tree_pivot_column.h>
+#include <phat/representations/packed_vector.h>
 
 #include <phat/algorithms/twist_reduction.h>
 #include <phat/algorithms/standard_reduction.h>
 #include <phat/algorithms/row_reduction.h>
 #include <phat/algorithms/chunk_reduction.h>
 #include <phat/algorithms/spectral_sequence_reduction.h>
+#include <phat/algorithms/parallel_reduction.h>
 
 #include <phat/helpers/dualize.h>
 
@@ -39,8 +41,8 @@
 #include <iomanip>
 
 
-enum Representation_type { VECTOR_VECTOR, VECTOR_HEAP, VECTOR_SET, SPARSE_PIVOT_COLUMN, HEAP_PIVOT_COLUMN, FULL_PIVOT_COLUMN, BIT_TREE_PIVOT_COLUMN, VECTOR_LIST };
-enum Algorithm_type  {STANDARD, TWIST, ROW, CHUNK, CHUNK_SEQUENTIAL, SPECTRAL_SEQUENCE, CHUNK_SQRT};
+enum Representation_type { VECTOR_VECTOR, VECTOR_HEAP, VECTOR_SET, SPARSE_PIVOT_COLUMN, HEAP_PIVOT_COLUMN, FULL_PIVOT_COLUMN, BIT_TREE_PIVOT_COLUMN, VECTOR_LIST, PACKED_VECTOR };
+enum Algorithm_type  {STANDARD, TWIST, ROW, CHUNK, CHUNK_SEQUENTIAL, SPECTRAL_SEQUENCE, CHUNK_SQRT, PARALLEL};
 enum Ansatz_type  {PRIMAL, DUAL};
 
 void print_help() {
@@ -54,8 +56,8 @@ void print_help() {
     std::cerr << "--help    --  prints this screen" << std::endl;
     std::cerr << "--dual   --  use only dualization approach" << std::endl;
     std::cerr << "--primal   --  use only primal approach" << std::endl;
-    std::cerr << "--vector_vector, --vector_heap, --vector_set, --vector_list, --full_pivot_column, --sparse_pivot_column, --heap_pivot_column, --bit_tree_pivot_column  --  use only a subset of representation data structures for boundary matrices" << std::endl;
-    std::cerr << "--standard, --twist, --chunk, --chunk_sequential, --spectral_sequence, --row  --  use only a subset of reduction algorithms" << std::endl;
+    std::cerr << "--vector_vector, --vector_heap, --vector_set, --vector_list, --full_pivot_column, --sparse_pivot_column, --heap_pivot_column, --bit_tree_pivot_column, --packed_vector  --  use only a subset of representation data structures for boundary matrices" << std::endl;
+    std::cerr << "--standard, --twist, --chunk, --chunk_sequential, --spectral_sequence, --row, --parallel  --  use only a subset of reduction algorithms" << std::endl;
 }
 
 void print_help_and_exit() {
@@ -83,6 +85,7 @@ void parse_command_line( int argc, char** argv, bool& latex_tables_output, bool&
             else if( argument == "--bit_tree_pivot_column" )  representations.push_back( BIT_TREE_PIVOT_COLUMN );
             else if( argument == "--sparse_pivot_column" ) representations.push_back( SPARSE_PIVOT_COLUMN );
             else if( argument == "--heap_pivot_column" ) representations.push_back( HEAP_PIVOT_COLUMN );
+            else if( argument == "--packed_vector" ) representations.push_back( PACKED_VECTOR );
             else if( argument == "--standard" ) algorithms.push_back( STANDARD );
             else if( argument == "--twist" ) algorithms.push_back( TWIST );
             else if( argument == "--row" ) algorithms.push_back( ROW );
@@ -90,6 +93,7 @@ void parse_command_line( int argc, char** argv, bool& latex_tables_output, bool&
             else if( argument == "--chunk_sqrt" ) algorithms.push_back( CHUNK_SQRT );
             else if( argument == "--spectral_sequence" ) algorithms.push_back( SPECTRAL_SEQUENCE );
             else if( argument == "--chunk" ) algorithms.push_back( CHUNK );
+            else if( argument == "--parallel" ) algorithms.push_back( PARALLEL );
             else if( argument == "--primal" ) ansaetze.push_back( PRIMAL );
             else if( argument == "--dual" ) ansaetze.push_back( DUAL );
             else if( argument == "--help" ) print_help_and_exit();
@@ -108,6 +112,7 @@ void parse_command_line( int argc, char** argv, bool& latex_tables_output, bool&
         representations.push_back( SPARSE_PIVOT_COLUMN );
         representations.push_back( FULL_PIVOT_COLUMN );
         representations.push_back( BIT_TREE_PIVOT_COLUMN );
+        representations.push_back( PACKED_VECTOR );
     }
 
     if( algorithms.empty() == true ) {
@@ -116,6 +121,7 @@ void parse_command_line( int argc, char** argv, bool& latex_tables_output, bool&
         algorithms.push_back( ROW );
         algorithms.push_back( CHUNK );
         algorithms.push_back( SPECTRAL_SEQUENCE );
+        algorithms.push_back( PARALLEL );
        // algorithms.push_back( CHUNK_SEQUENTIAL );
     }
     
@@ -198,6 +204,7 @@ void benchmark_latex( std::string input_filename, bool use_binary, Ansatz_type a
     case CHUNK: std::cout << " chunk,"; benchmark< phat::Representation, phat::chunk_reduction >( input_filename, use_binary, ansatz ); break; \
     case CHUNK_SQRT: std::cout << " chunk_sqrt,"; benchmark< phat::Representation, phat::chunk_reduction_sqrt >( input_filename, use_binary, ansatz ); break; \
     case SPECTRAL_SEQUENCE: std::cout << " spectral sequence,"; benchmark< phat::Representation, phat::spectral_sequence_reduction >( input_filename, use_binary, ansatz ); break; \
+    case PARALLEL: std::cout << " parallel,"; benchmark< phat::Representation, phat::parallel_reduction >( input_filename, use_binary, ansatz ); break; \
     case CHUNK_SEQUENTIAL: std::cout << " chunk_sequential,"; \
                            int num_threads = omp_get_max_threads(); \
                            omp_set_num_threads( 1 ); \
@@ -214,6 +221,7 @@ void benchmark_latex( std::string input_filename, bool use_binary, Ansatz_type a
     case CHUNK: benchmark_latex< phat::Representation, phat::chunk_reduction >( input_filename, use_binary, ansatz ); break; \
     case CHUNK_SQRT: benchmark_latex< phat::Representation, phat::chunk_reduction_sqrt >( input_filename, use_binary, ansatz ); break; \
     case SPECTRAL_SEQUENCE: benchmark_latex< phat::Representation, phat::spectral_sequence_reduction >( input_filename, use_binary, ansatz ); break; \
+    case PARALLEL: benchmark_latex< phat::Representation, phat::parallel_reduction >( input_filename, use_binary, ansatz ); break; \
     case CHUNK_SEQUENTIAL:  int num_threads = omp_get_max_threads( ); \
                             omp_set_num_threads( 1 ); \
                             benchmark_latex< phat::Representation, phat::chunk_reduction_sqrt >( input_filename, use_binary, ansatz ); \
@@ -252,6 +260,7 @@ int main( int argc, char** argv )
                         case BIT_TREE_PIVOT_COLUMN: COMPUTE(bit_tree_pivot_column) break;
                         case SPARSE_PIVOT_COLUMN: COMPUTE(sparse_pivot_column) break;
                         case HEAP_PIVOT_COLUMN: COMPUTE(heap_pivot_column) break;
+                        case PACKED_VECTOR: COMPUTE(packed_vector) break;
                         }
                     }
                 }
@@ -281,6 +290,7 @@ int main( int argc, char** argv )
                 case BIT_TREE_PIVOT_COLUMN: std::cout << "P-Bit-Tree"; break;
                 case SPARSE_PIVOT_COLUMN: std::cout << "P-Set"; break;
                 case HEAP_PIVOT_COLUMN: std::cout << "P-Heap"; break;
+                case PACKED_VECTOR: std::cout << "Packed"; break;
                 }
                 std::cout << std::setw( 1 );
             }
@@ -300,6 +310,7 @@ int main( int argc, char** argv )
                         case ROW: std::cout << "row"; break;
                         case CHUNK: std::cout << "chunk"; break;
                         case SPECTRAL_SEQUENCE: std::cout << "spectral sequence"; break;
+                        case PARALLEL: std::cout << "parallel"; break;
                         case CHUNK_SEQUENTIAL: std::cout << "chunk-sequential"; break;
                         case CHUNK_SQRT: std::cout << "chunk-sqrt"; break;
                         }
@@ -310,6 +321,7 @@ int main( int argc, char** argv )
                         case ROW: std::cout << "row$^*$"; break;
                         case CHUNK: std::cout << "chunk$^*$"; break;
                         case SPECTRAL_SEQUENCE: std::cout << "spectral sequence$^*$"; break;
+                        case PARALLEL: std::cout << "parallel$^*$"; break;
                         case CHUNK_SEQUENTIAL: std::cout << "chunk-sequential$^*$"; break;
                         case CHUNK_SQRT: std::cout << "chunk-sqrt"; break;
                         }
@@ -328,6 +340,7 @@ int main( int argc, char** argv )
                         case BIT_TREE_PIVOT_COLUMN: COMPUTE_LATEX( bit_tree_pivot_column ) break;
                         case SPARSE_PIVOT_COLUMN: COMPUTE_LATEX( sparse_pivot_column ) break;
                         case HEAP_PIVOT_COLUMN: COMPUTE_LATEX( heap_pivot_column ) break;
+                        case PACKED_VECTOR: COMPUTE_LATEX( packed_vector ) break;
                         }
                     }
                     std::cout << " \\\\" << std::endl;
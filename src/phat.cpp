@@ -26,17 +26,19 @@
 #include <phat/representations/heap_pivot_column.h>
 #include <phat/representations/full_pivot_column.h>
 #include <phat/representations/bit_tree_pivot_column.h>
+#include <phat/representations/packed_vector.h>
 
 #include <phat/algorithms/twist_reduction.h>
 #include <phat/algorithms/standard_reduction.h>
 #include <phat/algorithms/row_reduction.h>
 #include <phat/algorithms/chunk_reduction.h>
 #include <phat/algorithms/spectral_sequence_reduction.h>
+#include <phat/algorithms/parallel_reduction.h>
 
 #include <phat/helpers/dualize.h>
 
-enum Representation_type { VECTOR_VECTOR, VECTOR_HEAP, VECTOR_SET, SPARSE_PIVOT_COLUMN, FULL_PIVOT_COLUMN, BIT_TREE_PIVOT_COLUMN, VECTOR_LIST, HEAP_PIVOT_COLUMN };
-enum Algorithm_type  {STANDARD, TWIST, ROW, CHUNK, CHUNK_SEQUENTIAL, SPECTRAL_SEQUENCE };
+enum Representation_type { VECTOR_VECTOR, VECTOR_HEAP, VECTOR_SET, SPARSE_PIVOT_COLUMN, FULL_PIVOT_COLUMN, BIT_TREE_PIVOT_COLUMN, VECTOR_LIST, HEAP_PIVOT_COLUMN, PACKED_VECTOR };
+enum Algorithm_type  {STANDARD, TWIST, ROW, CHUNK, CHUNK_SEQUENTIAL, SPECTRAL_SEQUENCE, PARALLEL };
 
 void print_help() {
     std::cerr << "Usage: " << "phat " << "[options] input_filename output_filename" << std::endl;
@@ -48,8 +50,8 @@ void print_help() {
     std::cerr << "--help    --  prints this screen" << std::endl;
     std::cerr << "--verbose --  verbose output" << std::endl;
     std::cerr << "--dualize   --  use dualization approach" << std::endl;
-    std::cerr << "--vector_vector, --vector_heap, --vector_set, --vector_list, --full_pivot_column, --sparse_pivot_column, --heap_pivot_column, --bit_tree_pivot_column  --  selects a representation data structure for boundary matrices (default is '--bit_tree_pivot_column')" << std::endl;
-    std::cerr << "--standard, --twist, --chunk, --chunk_sequential, --spectral_sequence, --row  --  selects a reduction algorithm (default is '--twist')" << std::endl;
+    std::cerr << "--vector_vector, --vector_heap, --vector_set, --vector_list, --full_pivot_column, --sparse_pivot_column, --heap_pivot_column, --bit_tree_pivot_column, --packed_vector  --  selects a representation data structure for boundary matrices (default is '--bit_tree_pivot_column')" << std::endl;
+    std::cerr << "--standard, --twist, --chunk, --chunk_sequential, --spectral_sequence, --row, --parallel  --  selects a reduction algorithm (default is '--twist')" << std::endl;
 }
 
 void print_help_and_exit() {
@@ -79,12 +81,14 @@ void parse_command_line( int argc, char** argv, bool& use_binary, Representation
         else if( option == "--bit_tree_pivot_column" )  representation = BIT_TREE_PIVOT_COLUMN;
         else if( option == "--sparse_pivot_column" ) representation = SPARSE_PIVOT_COLUMN;
         else if( option == "--heap_pivot_column" ) representation = HEAP_PIVOT_COLUMN;
+        else if( option == "--packed_vector" ) representation = PACKED_VECTOR;
         else if( option == "--standard" ) algorithm = STANDARD;
         else if( option == "--twist" ) algorithm = TWIST;
         else if( option == "--row" ) algorithm = ROW;
         else if( option == "--chunk" ) algorithm = CHUNK;
         else if( option == "--chunk_sequential" ) algorithm = CHUNK_SEQUENTIAL;
         else if( option == "--spectral_sequence" ) algorithm = SPECTRAL_SEQUENCE;
+        else if( option == "--parallel" ) algorithm = PARALLEL;
         else if( option == "--verbose" ) verbose = true;
         else if( option == "--help" ) print_help_and_exit();
         else print_help_and_exit();
@@ -158,6 +162,7 @@ void compute_pairing( std::string input_filename, std::string output_filename, b
     case ROW: compute_pairing< phat::Representation, phat::row_reduction >( input_filename, output_filename, use_binary, verbose, dualize ); break; \
     case SPECTRAL_SEQUENCE: compute_pairing< phat::Representation, phat::spectral_sequence_reduction >( input_filename, output_filename, use_binary, verbose, dualize ); break; \
     case CHUNK: compute_pairing< phat::Representation, phat::chunk_reduction >( input_filename, output_filename, use_binary, verbose, dualize ); break; \
+    case PARALLEL: compute_pairing< phat::Representation, phat::parallel_reduction >( input_filename, output_filename, use_binary, verbose, dualize ); break; \
     case CHUNK_SEQUENTIAL: int num_threads = omp_get_max_threads(); \
                            omp_set_num_threads( 1 ); \
                            compute_pairing< phat::Representation, phat::chunk_reduction >( input_filename, output_filename, use_binary, verbose, dualize ); break; \
@@ -186,5 +191,6 @@ int main( int argc, char** argv )
     case BIT_TREE_PIVOT_COLUMN: COMPUTE_PAIRING(bit_tree_pivot_column) break;
     case SPARSE_PIVOT_COLUMN: COMPUTE_PAIRING(sparse_pivot_column) break;
     case HEAP_PIVOT_COLUMN: COMPUTE_PAIRING(heap_pivot_column) break;
+    case PACKED_VECTOR: COMPUTE_PAIRING(packed_vector) break;
     }
 }
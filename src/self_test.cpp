@@ -26,12 +26,14 @@
 #include <phat/representations/heap_pivot_column.h>
 #include <phat/representations/full_pivot_column.h>
 #include <phat/representations/bit_tree_pivot_column.h>
+#include <phat/representations/packed_vector.h>
 
 #include <phat/algorithms/twist_reduction.h>
 #include <phat/algorithms/standard_reduction.h>
 #include <phat/algorithms/row_reduction.h>
 #include <phat/algorithms/chunk_reduction.h>
 #include <phat/algorithms/spectral_sequence_reduction.h>
+#include <phat/algorithms/parallel_reduction.h>
 
 int main( int argc, char** argv )
 {
@@ -45,6 +47,7 @@ int main( int argc, char** argv )
     typedef phat::vector_heap Vec_heap;
     typedef phat::vector_set Vec_set;
     typedef phat::vector_list Vec_list;
+    typedef phat::packed_vector Packed_vec;
 
     std::cout << "Reading test data " << test_data << " in binary format ..." << std::endl;
     phat::boundary_matrix< Full > boundary_matrix;
@@ -96,6 +99,11 @@ int main( int argc, char** argv )
         phat::boundary_matrix< Vec_list > vec_list_boundary_matrix = boundary_matrix;
         phat::compute_persistence_pairs< phat::chunk_reduction >( vec_list_pairs, vec_list_boundary_matrix );
 
+        std::cout << "Running Chunk - Packed_vec ..." << std::endl;
+        phat::persistence_pairs packed_vec_pairs;
+        phat::boundary_matrix< Packed_vec > packed_vec_boundary_matrix = boundary_matrix;
+        phat::compute_persistence_pairs< phat::chunk_reduction >( packed_vec_pairs, packed_vec_boundary_matrix );
+
         if( sparse_pairs != heap_pairs ) {
             std::cerr << "Error: sparse and heap differ!" << std::endl;
             error = true;
@@ -124,8 +132,12 @@ int main( int argc, char** argv )
             std::cerr << "Error: bit_tree and vec_list differ!" << std::endl;
             error = true;
         }
-        if( vec_list_pairs != sparse_pairs ) {
-            std::cerr << "Error: vec_list and sparse differ!" << std::endl;
+        if( vec_list_pairs != packed_vec_pairs ) {
+            std::cerr << "Error: vec_list and packed_vec differ!" << std::endl;
+            error = true;
+        }
+        if( packed_vec_pairs != sparse_pairs ) {
+            std::cerr << "Error: packed_vec and sparse differ!" << std::endl;
             error = true;
         }
 
@@ -160,6 +172,11 @@ int main( int argc, char** argv )
         phat::boundary_matrix< BitTree > ss_boundary_matrix = boundary_matrix;
         phat::compute_persistence_pairs< phat::spectral_sequence_reduction >( ss_pairs, ss_boundary_matrix );
 
+        std::cout << "Running Parallel - BitTree ..." << std::endl;
+        phat::persistence_pairs parallel_pairs;
+        phat::boundary_matrix< BitTree > parallel_boundary_matrix = boundary_matrix;
+        phat::compute_persistence_pairs< phat::parallel_reduction >( parallel_pairs, parallel_boundary_matrix );
+
         if( twist_pairs != std_pairs ) {
             std::cerr << "Error: twist and standard differ!" << std::endl;
             error = true;
@@ -176,8 +193,12 @@ int main( int argc, char** argv )
             std::cerr << "Error: row and spectral sequence differ!" << std::endl;
             error = true;
         }
-        if( ss_pairs != twist_pairs ) {
-            std::cerr << "Error: spectral sequence and twist differ!" << std::endl;
+        if( ss_pairs != parallel_pairs ) {
+            std::cerr << "Error: spectral sequence and parallel differ!" << std::endl;
+            error = true;
+        }
+        if( parallel_pairs != twist_pairs ) {
+            std::cerr << "Error: parallel and twist differ!" << std::endl;
             error = true;
         }
 